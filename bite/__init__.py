@@ -1,30 +1,64 @@
 __all__ = [
     "decode", "materials", "pixels", "textures",
     "Material", "Slot",
-    "Face", "MipIndex", "Size", "Texture",
+    "Face", "MipIndex", "MipTable", "Size", "Texture",
     "Matl", "Vmt",
     "Dds", "Pvr", "Vms", "Vtf"]
+# NOTE: "render" & "view" are also available if their dependencies are
+# -- but are left out of __all__ so `from bite import *` never probes for them
 
-# core
-from . import decode
-from . import materials
-from . import pixels
-from . import textures
-# base classes / utils
-from .materials import Material, Slot
-from .textures import Face, MipIndex, Size, Texture
-# formats
-from .materials import Matl, Vmt
-from .textures import Dds, Pvr, Vms, Vtf
-
-
-# extras
-import importlib.util
-
-# viewer
-if all(importlib.util.find_spec(dependency) is not None
-       for dependency in ("OpenGL", "dearpygui")):
-    from . import render  # noqa F401
-    from . import view  # noqa F401
-
-    __all__.extend(["render", "view"])
+import functools as _functools
+import importlib as _importlib
+import importlib.util as _importlib_util
+
+
+# NOTE: nothing is imported until it's first accessed (PEP 562)
+# -- e.g. bite.Vmt won't import numpy
+_lazy_imports = {
+    # core
+    "decode": ".decode",
+    "materials": ".materials",
+    "pixels": ".pixels",
+    "textures": ".textures",
+    # base classes / utils
+    **{name: ".materials" for name in ("Material", "Slot")},
+    **{name: ".textures" for name in (
+        "Face", "MipIndex", "MipTable", "Size", "Texture")},
+    # formats
+    **{name: ".materials" for name in ("Matl", "Vmt")},
+    **{name: ".textures" for name in ("Dds", "Pvr", "Vms", "Vtf")},
+    # viewer
+    "render": ".render",
+    "view": ".view"}
+
+_viewer_dependencies = ("OpenGL", "dearpygui")
+
+
+# NOTE: find_spec walks sys.path, but the answer won't change at runtime
+@_functools.lru_cache(maxsize=None)
+def _is_installed(dependency: str) -> bool:
+    return _importlib_util.find_spec(dependency) is not None
+
+
+def _has_viewer_dependencies() -> bool:
+    return all(map(_is_installed, _viewer_dependencies))
+
+
+def __getattr__(name: str):
+    if name not in _lazy_imports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name in ("render", "view"):
+        if not _has_viewer_dependencies():
+            raise AttributeError(f"bite.{name} requires {_viewer_dependencies}")
+    module = _importlib.import_module(_lazy_imports[name], __name__)
+    is_submodule = _lazy_imports[name] == f".{name}"
+    out = module if is_submodule else getattr(module, name)
+    globals()[name] = out  # skip __getattr__ next time
+    return out
+
+
+def __dir__():
+    names = {*globals(), *_lazy_imports}
+    if not _has_viewer_dependencies():
+        names -= {"render", "view"}
+    return sorted(names)
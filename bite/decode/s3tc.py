@@ -1,9 +1,8 @@
 """BCn / DXTn / DXTC / S3TC"""
 # https://en.wikipedia.org/wiki/S3_Texture_Compression
-import functools
 import math
-import struct
-from typing import List
+import re
+from typing import List, Tuple, Union
 
 import numpy as np
 
@@ -12,25 +11,25 @@ from ..textures.base import MipIndex, Texture
 
 # NOTE: output should be cropped to (width, height) if oversized
 # -- mode = {3: "RGB", 4: "RGBA"}[out.shape[3]]
-# -- img = Image.frombytes(mode, out.shape[:2], out.flatten().tobytes())
+# -- img = Image.frombytes(mode, out.shape[:2], out.tobytes())
 # -- img = img.crop((0, 0, *texture.mip_size(mip_index)))
 # -- OR: out = out[:width, :height]
-def concatenate(tiles: List[np.array], width: int, height: int) -> np.array:
-    tile_width, tile_height = tiles[0].shape[:2]
+def concatenate(tiles: np.array, width: int, height: int) -> np.array:
+    """(N, x, y, C) tiles -> (x, y, C) image"""
+    num_tiles, tile_width, tile_height, num_channels = tiles.shape
     num_cols = math.ceil(width / tile_width)
     num_rows = math.ceil(height / tile_height)
-    assert num_cols * num_rows == len(tiles)
-    out = np.concatenate([
-        np.concatenate(tiles[i:i + num_cols], axis=0)
-        for i in range(0, len(tiles), num_cols)], axis=1)
-    assert out.shape[:2] == (num_cols * tile_width, num_rows * tile_height)
-    return out
+    assert num_cols * num_rows == num_tiles
+    # NOTE: tiles are in row-major order; a single copy rearranges them
+    grid = tiles.reshape(num_rows, num_cols, tile_width, tile_height, num_channels)
+    return grid.transpose(1, 2, 0, 3, 4).reshape(
+        num_cols * tile_width, num_rows * tile_height, num_channels)
 
 
 # NOTE: it's easier to calculate the DXT1 palette as rgb888
 # -- otherwise we'd assemble a 565 image & convert the whole image to 888
-@functools.cache
-def rgb565_as_rgb888(pixel: int) -> (int, int, int):
+# NOTE: works on a single int or a whole np.array of pixels
+def rgb565_as_rgb888(pixel: Union[int, np.array]) -> (int, int, int):
     r = (pixel >> 0xB) & 0x1F
     g = (pixel >> 0x5) & 0x3F
     b = (pixel >> 0x0) & 0x1F
@@ -40,36 +39,46 @@ def rgb565_as_rgb888(pixel: int) -> (int, int, int):
     return (r, g, b)
 
 
-@functools.cache
-def DXT1_block(block: bytes) -> np.array:
-    # decode palette
-    c0, c1 = [rgb565_as_rgb888(c) for c in struct.unpack("2H", block[:4])]
-    if c0 > c1:
-        c2 = [a * 2 // 3 + b // 3 for a, b in zip(c0, c1)]
-        c3 = [a // 3 + b * 2 // 3 for a, b in zip(c0, c1)]
-    else:  # c0 <= c1
-        c2 = [a // 2 + b // 2 for a, b in zip(c0, c1)]
-        c3 = (0, 0, 0)
-    palette = (c0, c1, tuple(c2), tuple(c3))
-    # decode indices
-    return np.array([[
-        palette[(row >> (i * 2)) % 4]
-        for row in block[4:]]
-        for i in range(4)], dtype=np.uint8)
-
-
-@functools.cache
-def DXT1_block_fast(block: bytes) -> np.array:
-    """single palette mode"""
-    c0, c1 = [rgb565_as_rgb888(c) for c in struct.unpack("2H", block[:4])]
-    c2 = [a * 2 // 3 + b // 3 for a, b in zip(c0, c1)]
-    c3 = [a // 3 + b * 2 // 3 for a, b in zip(c0, c1)]
-    palette = (c0, c1, tuple(c2), tuple(c3))
+dxt1_block = np.dtype([
+    ("colours", "<u2", 2),  # rgb565
+    ("indices", "u1", 4)])  # 2 bits per pixel, 1 byte per row
+
+# NOTE: DXT3 & DXT5 blocks are 8 bytes of alpha + a DXT1 block
+dxt_block = np.dtype([
+    ("alpha", "u1", 8),
+    ("colour", dxt1_block)])
+
+
+def DXT1_palettes(colours: np.array) -> np.array:
+    """(N, 2) rgb565 endpoints -> (N, 4, rgb) 4 colour palettes"""
+    c0, c1 = [
+        np.stack(rgb565_as_rgb888(c), axis=-1)
+        for c in colours.astype(np.int32).T]
+    c2 = (c0 * 2 + c1) // 3
+    c3 = (c0 + c1 * 2) // 3
+    return np.stack([c0, c1, c2, c3], axis=1).astype(np.uint8)
+
+
+# NOTE: DXT1A; if c0 <= c1 the palette is 3 colours + black (or transparent)
+def DXT1A_palettes(colours: np.array) -> np.array:
+    """(N, 2) rgb565 endpoints -> (N, 4, rgb) 4 or 3 colour palettes"""
+    palettes = DXT1_palettes(colours)
+    is_3_colour = colours[:, 0] <= colours[:, 1]
+    c0, c1 = palettes[is_3_colour, 0:2].astype(np.int32).transpose(1, 0, 2)
+    palettes[is_3_colour, 2] = (c0 + c1) // 2
+    palettes[is_3_colour, 3] = 0
+    return palettes
+
+
+def DXT1_tiles(blocks: np.array, fast=True) -> np.array:
+    """decode an array of dxt1_block all at once -> (N, x, y, rgb)"""
+    # NOTE: fast skips the c0 <= c1 check entirely
+    palettes = (DXT1_palettes if fast else DXT1A_palettes)(blocks["colours"])
     # decode indices
-    return np.array([[
-        palette[(row >> (i * 2)) % 4]
-        for row in block[4:]]
-        for i in range(4)], dtype=np.uint8)
+    rows = blocks["indices"][:, np.newaxis, :]
+    shifts = np.arange(0, 8, 2, dtype=np.uint8)[np.newaxis, :, np.newaxis]
+    indices = (rows >> shifts) & 0b11
+    return palettes[np.arange(len(blocks))[:, np.newaxis, np.newaxis], indices]
 
 
 # NOTE: also known as BC1
@@ -78,23 +87,19 @@ def DXT1(texture: Texture, mip_index: MipIndex = None, fast=True) -> np.array:
     if mip_index is None:
         mip_index = texture.default_mip()
     pixel_data = texture.mipmaps[mip_index]
-    decode_funcs = {
-        True: DXT1_block_fast,
-        False: DXT1_block}
-    decode_block = decode_funcs[fast]
-    tiles = [
-        decode_block(pixel_data[i:i + 8])
-        for i in range(0, len(pixel_data), 8)]
+    # NOTE: fast ignores c0 <= c1 & always uses the 4 colour palette
+    tiles = DXT1_tiles(np.frombuffer(pixel_data, dtype=dxt1_block), fast)
     return concatenate(tiles, *texture.mip_size(mip_index))
 
 
-@functools.cache
-def DXT3_alpha_block(block: bytes) -> np.array:
-    """4x4 4bpp alpha"""
-    alpha = np.array([
-        block[i // 2] >> 4 if i % 2 == 0 else block[i // 2] & 0xF
-        for i in range(16)], dtype=np.uint8)
-    return (alpha | alpha << 4).reshape((4, 4, 1))
+def DXT3_alpha_tiles(blocks: np.array) -> np.array:
+    """decode (N, 8) 4bpp alpha blocks all at once -> (N, x, y, 1)"""
+    # NOTE: 4 bits per pixel, row by row, low nibble first
+    alpha = np.empty((len(blocks), 16), dtype=np.uint8)
+    alpha[:, 0::2] = blocks & 0x0F
+    alpha[:, 1::2] = blocks >> 4
+    alpha |= alpha << 4
+    return alpha.reshape(-1, 4, 4).transpose(0, 2, 1)[..., np.newaxis]
 
 
 # NOTE: both DXT2 & DXT3 are BC2
@@ -104,46 +109,36 @@ def DXT3(texture: Texture, mip_index: MipIndex = None) -> np.array:
     if mip_index is None:
         mip_index = texture.default_mip()
     pixel_data = texture.mipmaps[mip_index]
-    a_tiles = list()
-    rgb_tiles = list()
-    for i in range(0, len(pixel_data), 16):
-        a_tiles.append(DXT3_alpha_block(pixel_data[i:i + 8]))
-        rgb_tiles.append(DXT1_block_fast(pixel_data[i + 8:i + 16]))
-    tiles = [
-        np.concatenate((rgb, a), axis=2)
-        for rgb, a in zip(rgb_tiles, a_tiles)]
+    blocks = np.frombuffer(pixel_data, dtype=dxt_block)
+    a_tiles = DXT3_alpha_tiles(blocks["alpha"])
+    rgb_tiles = DXT1_tiles(blocks["colour"])
+    tiles = np.concatenate((rgb_tiles, a_tiles), axis=3)
     return concatenate(tiles, *texture.mip_size(mip_index))
 
 
-@functools.cache
-def DXT5_alpha_block(block: bytes) -> np.array:
-    # decode palette
-    a0, a1 = block[:2]
-    if a0 > a1:
-        a2 = (a0 * 6 + a1 * 1) // 7
-        a3 = (a0 * 5 + a1 * 2) // 7
-        a4 = (a0 * 4 + a1 * 3) // 7
-        a5 = (a0 * 3 + a1 * 4) // 7
-        a6 = (a0 * 2 + a1 * 5) // 7
-        a7 = (a0 * 1 + a1 * 6) // 7
-    else:  # a0 <= a1
-        a2 = (a0 * 4 + a1 * 1) // 5
-        a3 = (a0 * 3 + a1 * 2) // 5
-        a4 = (a0 * 2 + a1 * 3) // 5
-        a5 = (a0 * 1 + a1 * 4) // 5
-        a6 = 0
-        a7 = 255
-    palette = (a0, a1, a2, a3, a4, a5, a6, a7)
+def DXT5_alpha_tiles(blocks: np.array) -> np.array:
+    """decode (N, 8) alpha blocks all at once -> (N, x, y, 1)"""
+    # decode palettes
+    a0 = blocks[:, 0:1].astype(np.int32)
+    a1 = blocks[:, 1:2].astype(np.int32)
+    i = np.arange(1, 7)
+    lerp_7 = (a0 * (7 - i) + a1 * i) // 7
+    i = np.arange(1, 5)
+    lerp_5 = np.concatenate([  # a0 <= a1
+        (a0 * (5 - i) + a1 * i) // 5,
+        np.full_like(a0, 0),
+        np.full_like(a0, 255)], axis=1)
+    palettes = np.concatenate(
+        [a0, a1, np.where(a0 > a1, lerp_7, lerp_5)], axis=1).astype(np.uint8)
     # decode indices
-    rows = [  # 4x 3-bit indices per row
-        int(block[2:4].hex()[:3], 16),
-        int(block[3:5].hex()[1:], 16),
-        int(block[5:7].hex()[:3], 16),
-        int(block[6:8].hex()[1:], 16)]
-    return np.rot90(np.array([[
-        [palette[(row >> (i * 3)) & 0b111]]
-        for i in range(4)]
-        for row in rows], dtype=np.uint8), 3)
+    # NOTE: 16x 3-bit indices in a 48-bit little-endian int, row by row
+    raw_indices = np.zeros((len(blocks), 8), dtype=np.uint8)
+    raw_indices[:, :6] = blocks[:, 2:]
+    bits = raw_indices.view("<u8")
+    shifts = (np.arange(16, dtype=np.uint64) * 3).reshape(4, 4).T  # [x][y]
+    indices = ((bits[:, :, np.newaxis] >> shifts) & 0b111).astype(np.intp)
+    alpha = palettes[np.arange(len(blocks))[:, np.newaxis, np.newaxis], indices]
+    return alpha[..., np.newaxis]
 
 
 # NOTE: Both DXT4 & DXT5 are BC3
@@ -153,30 +148,227 @@ def DXT5(texture: Texture, mip_index: MipIndex = None) -> np.array:
     if mip_index is None:
         mip_index = texture.default_mip()
     pixel_data = texture.mipmaps[mip_index]
-    a_tiles = list()
-    rgb_tiles = list()
-    for i in range(0, len(pixel_data), 16):
-        a_tiles.append(DXT5_alpha_block(pixel_data[i:i + 8]))
-        rgb_tiles.append(DXT1_block_fast(pixel_data[i + 8:i + 16]))
-    tiles = [
-        np.concatenate((rgb, a), axis=2)
-        for rgb, a in zip(rgb_tiles, a_tiles)]
+    blocks = np.frombuffer(pixel_data, dtype=dxt_block)
+    a_tiles = DXT5_alpha_tiles(blocks["alpha"])
+    rgb_tiles = DXT1_tiles(blocks["colour"])
+    tiles = np.concatenate((rgb_tiles, a_tiles), axis=3)
     return concatenate(tiles, *texture.mip_size(mip_index))
 
 
 # NOTE: BC6H is quite complex, easier to decode on GPU than CPU
 # -- https://learn.microsoft.com/en-us/windows/win32/direct3d11/bc6h-format
-def BC6H_block(block: bytes) -> np.array:
-    raise NotImplementedError()
+# -- each mode is decoded for every block that uses it at once
+# {mode_bits: (is_transformed, endpoint_bits, delta_bits, layout)}
+# NOTE: layout follows the mode bits; bits are stored low to high
+# -- "rw[10:11]" is stored in reverse order (high to low)
+bc6h_modes = {
+    # 2 regions
+    0b00: (True, 10, (5, 5, 5), """
+        gy[4] by[4] bz[4] rw[9:0] gw[9:0] bw[9:0] rx[4:0] gz[4] gy[3:0]
+        gx[4:0] bz[0] gz[3:0] bx[4:0] bz[1] by[3:0] ry[4:0] bz[2] rz[4:0]
+        bz[3] d[4:0]"""),
+    0b01: (True, 7, (6, 6, 6), """
+        gy[5] gz[4] gz[5] rw[6:0] bz[0] bz[1] by[4] gw[6:0] by[5] bz[2]
+        gy[4] bw[6:0] bz[3] bz[5] bz[4] rx[5:0] gy[3:0] gx[5:0] gz[3:0]
+        bx[5:0] by[3:0] ry[5:0] rz[5:0] d[4:0]"""),
+    0b00010: (True, 11, (5, 4, 4), """
+        rw[9:0] gw[9:0] bw[9:0] rx[4:0] rw[10] gy[3:0] gx[3:0] gw[10] bz[0]
+        gz[3:0] bx[3:0] bw[10] bz[1] by[3:0] ry[4:0] bz[2] rz[4:0] bz[3]
+        d[4:0]"""),
+    0b00110: (True, 11, (4, 5, 4), """
+        rw[9:0] gw[9:0] bw[9:0] rx[3:0] rw[10] gz[4] gy[3:0] gx[4:0] gw[10]
+        gz[3:0] bx[3:0] bw[10] bz[1] by[3:0] ry[3:0] bz[0] bz[2] rz[3:0]
+        gy[4] bz[3] d[4:0]"""),
+    0b01010: (True, 11, (4, 4, 5), """
+        rw[9:0] gw[9:0] bw[9:0] rx[3:0] rw[10] by[4] gy[3:0] gx[3:0] gw[10]
+        bz[0] gz[3:0] bx[4:0] bw[10] by[3:0] ry[3:0] bz[1] bz[2] rz[3:0]
+        bz[4] bz[3] d[4:0]"""),
+    0b01110: (True, 9, (5, 5, 5), """
+        rw[8:0] by[4] gw[8:0] gy[4] bw[8:0] bz[4] rx[4:0] gz[4] gy[3:0]
+        gx[4:0] bz[0] gz[3:0] bx[4:0] bz[1] by[3:0] ry[4:0] bz[2] rz[4:0]
+        bz[3] d[4:0]"""),
+    0b10010: (True, 8, (6, 5, 5), """
+        rw[7:0] gz[4] by[4] gw[7:0] bz[2] gy[4] bw[7:0] bz[3] bz[4] rx[5:0]
+        gy[3:0] gx[4:0] bz[0] gz[3:0] bx[4:0] bz[1] by[3:0] ry[5:0] rz[5:0]
+        d[4:0]"""),
+    0b10110: (True, 8, (5, 6, 5), """
+        rw[7:0] bz[0] by[4] gw[7:0] gy[5] gy[4] bw[7:0] gz[5] bz[4] rx[4:0]
+        gz[4] gy[3:0] gx[5:0] gz[3:0] bx[4:0] bz[1] by[3:0] ry[4:0] bz[2]
+        rz[4:0] bz[3] d[4:0]"""),
+    0b11010: (True, 8, (5, 5, 6), """
+        rw[7:0] bz[1] by[4] gw[7:0] by[5] gy[4] bw[7:0] bz[5] bz[4] rx[4:0]
+        gz[4] gy[3:0] gx[4:0] bz[0] gz[3:0] bx[5:0] by[3:0] ry[4:0] bz[2]
+        rz[4:0] bz[3] d[4:0]"""),
+    0b11110: (False, 6, (6, 6, 6), """
+        rw[5:0] gz[4] bz[0] bz[1] by[4] gw[5:0] gy[5] by[5] bz[2] gy[4]
+        bw[5:0] gz[5] bz[3] bz[5] bz[4] rx[5:0] gy[3:0] gx[5:0] gz[3:0]
+        bx[5:0] by[3:0] ry[5:0] rz[5:0] d[4:0]"""),
+    # 1 region
+    0b00011: (False, 10, (10, 10, 10), """
+        rw[9:0] gw[9:0] bw[9:0] rx[9:0] gx[9:0] bx[9:0]"""),
+    0b00111: (True, 11, (9, 9, 9), """
+        rw[9:0] gw[9:0] bw[9:0] rx[8:0] rw[10] gx[8:0] gw[10] bx[8:0]
+        bw[10]"""),
+    0b01011: (True, 12, (8, 8, 8), """
+        rw[9:0] gw[9:0] bw[9:0] rx[7:0] rw[10:11] gx[7:0] gw[10:11] bx[7:0]
+        bw[10:11]"""),
+    0b01111: (True, 16, (4, 4, 4), """
+        rw[9:0] gw[9:0] bw[9:0] rx[3:0] rw[10:15] gx[3:0] gw[10:15] bx[3:0]
+        bw[10:15]""")}
+# NOTE: any other mode is reserved & decodes to black
+
+
+def bc6h_layout(layout: str) -> List[Tuple[str, int, int, bool]]:
+    """"rw[9:0] rw[10:11]" -> [(field, lowest_bit, num_bits, is_reversed)]"""
+    out = list()
+    for field, first, last in re.findall(r"(\w+)\[(\d+)(?::(\d+))?\]", layout):
+        first = int(first)
+        last = first if last == "" else int(last)
+        lowest_bit, highest_bit = sorted((first, last))
+        out.append((field, lowest_bit, highest_bit - lowest_bit + 1, first < last))
+    return out
+
+
+bc6h_layouts = {
+    mode: bc6h_layout(layout)
+    for mode, (is_transformed, endpoint_bits, delta_bits, layout) in bc6h_modes.items()}
+
+# 2 region partitions; 1 bit per pixel, set if in the 2nd region
+bc6h_partitions = np.array([
+    0xCCCC, 0x8888, 0xEEEE, 0xECC8, 0xC880, 0xFEEC, 0xFEC8, 0xEC80,
+    0xC800, 0xFFEC, 0xFE80, 0xE800, 0xFFE8, 0xFF00, 0xFFF0, 0xF000,
+    0xF710, 0x008E, 0x7100, 0x08CE, 0x008C, 0x7310, 0x3100, 0x8CCE,
+    0x088C, 0x3110, 0x6666, 0x366C, 0x17E8, 0x0FF0, 0x718E, 0x399C])
+
+# index of the 2nd region's first pixel, which stores 1 less index bit
+bc6h_anchors = np.array([
+    15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15,
+    15, 2, 8, 2, 2, 8, 8, 15, 2, 8, 2, 2, 8, 8, 2, 2])
+
+# {index_bits: weights}
+bc6h_weights = {
+    3: np.array([0, 9, 18, 27, 37, 46, 55, 64]),
+    4: np.array([0, 4, 9, 13, 17, 21, 26, 30, 34, 38, 43, 47, 51, 55, 60, 64])}
+
+
+def read_bits(lo: np.array, hi: np.array, start: int, num_bits: int) -> np.array:
+    """bits from an array of 128-bit ints, split into 2 uint64 halves"""
+    if start >= 64:
+        bits = hi >> np.uint64(start - 64)
+    elif start + num_bits <= 64:
+        bits = lo >> np.uint64(start)
+    else:  # spans both halves
+        bits = (lo >> np.uint64(start)) | (hi << np.uint64(64 - start))
+    return (bits & np.uint64((1 << num_bits) - 1)).astype(np.int64)
+
+
+def sign_extend(value: np.array, bits: Union[int, np.array]) -> np.array:
+    sign_bit = np.left_shift(1, np.subtract(bits, 1))
+    return (value ^ sign_bit) - sign_bit
+
+
+def bc6h_unquantize(endpoints: np.array, bits: int, signed: bool) -> np.array:
+    """endpoints -> 16-bit (17-bit if signed) interpolation space"""
+    if signed:
+        if bits >= 16:
+            return endpoints
+        magnitude = np.abs(endpoints)
+        out = ((magnitude << 15) + 0x4000) >> (bits - 1)
+        out[magnitude == 0] = 0
+        out[magnitude >= (1 << (bits - 1)) - 1] = 0x7FFF
+        return np.where(endpoints < 0, -out, out)
+    else:
+        if bits >= 15:
+            return endpoints
+        out = ((endpoints << 16) + 0x8000) >> bits
+        out[endpoints == 0] = 0
+        out[endpoints == (1 << bits) - 1] = 0xFFFF
+        return out
+
+
+def BC6H_mode(blocks: np.array, mode: int, signed: bool) -> np.array:
+    """decode (N, 2) uint64 blocks which share a mode -> (N, pixel, rgb) float16 bits"""
+    is_transformed, endpoint_bits, delta_bits, layout = bc6h_modes[mode]
+    num_regions = 1 if mode & 0b11 == 0b11 else 2
+    lo, hi = blocks.T
+    # read fields
+    fields = {
+        f"{channel}{endpoint}": np.zeros(len(blocks), dtype=np.int64)
+        for channel in "rgb"
+        for endpoint in "wxyz"}
+    fields["d"] = np.zeros(len(blocks), dtype=np.int64)  # partition
+    start = 2 if mode < 0b10 else 5
+    for field, lowest_bit, num_bits, is_reversed in bc6h_layouts[mode]:
+        bits = read_bits(lo, hi, start, num_bits)
+        if is_reversed:
+            bits = sum(
+                ((bits >> i) & 1) << (num_bits - 1 - i)
+                for i in range(num_bits))
+        fields[field] |= bits << lowest_bit
+        start += num_bits
+    # decode endpoints
+    endpoints = np.stack([  # [block][endpoint][channel]
+        np.stack([fields[f"{channel}{endpoint}"] for channel in "rgb"], axis=-1)
+        for endpoint in "wxyz"[:num_regions * 2]], axis=1)
+    if signed:
+        endpoints[:, 0] = sign_extend(endpoints[:, 0], endpoint_bits)
+    if is_transformed:  # x, y & z are signed deltas from w
+        deltas = sign_extend(endpoints[:, 1:], delta_bits)
+        endpoints[:, 1:] = (endpoints[:, :1] + deltas) & ((1 << endpoint_bits) - 1)
+    if signed:
+        endpoints[:, 1:] = sign_extend(endpoints[:, 1:], endpoint_bits)
+    endpoints = bc6h_unquantize(endpoints, endpoint_bits, signed)
+    # decode indices
+    # NOTE: the first pixel of each region (anchor) has 1 less index bit
+    pixels = np.arange(16)
+    if num_regions == 2:
+        index_bits, first_index = 3, 82
+        partitions = fields["d"]
+        anchors = bc6h_anchors[partitions][:, np.newaxis]
+        regions = (bc6h_partitions[partitions][:, np.newaxis] >> pixels) & 1
+    else:
+        index_bits, first_index = 4, 65
+        anchors = np.full((len(blocks), 1), 16)  # no 2nd region
+        regions = np.zeros((len(blocks), 16), dtype=np.int64)
+    starts = first_index + pixels * index_bits - (pixels > 0) - (pixels > anchors)
+    num_bits = index_bits - (pixels == 0) - (pixels == anchors)
+    indices = (hi[:, np.newaxis] >> (starts - 64).astype(np.uint64)) & (
+        (np.uint64(1) << num_bits.astype(np.uint64)) - np.uint64(1))
+    weights = bc6h_weights[index_bits][indices.astype(np.intp)][..., np.newaxis]
+    # interpolate
+    rows = np.arange(len(blocks))[:, np.newaxis]
+    a = endpoints[rows, regions * 2]
+    b = endpoints[rows, regions * 2 + 1]
+    colours = (a * (64 - weights) + b * weights + 32) >> 6
+    # finish unquantize -> float16 bits
+    if signed:
+        magnitude = (np.abs(colours) * 31) >> 5
+        is_negative = (colours < 0) & (magnitude > 0)
+        return np.where(is_negative, magnitude | 0x8000, magnitude).astype(np.uint16)
+    else:
+        return ((colours * 31) >> 6).astype(np.uint16)
+
+
+def BC6H_tiles(blocks: np.array, signed=False) -> np.array:
+    """decode (N, 16) BC6H blocks all at once -> (N, x, y, rgb) float16"""
+    blocks = np.ascontiguousarray(blocks).view("<u8")
+    modes = (blocks[:, 0] & 0b11).astype(np.int64)
+    has_5_bit_mode = modes >= 0b10
+    modes[has_5_bit_mode] = blocks[has_5_bit_mode, 0] & 0b11111
+    out = np.zeros((len(blocks), 16, 3), dtype=np.uint16)
+    for mode in np.unique(modes):
+        if mode in bc6h_modes:
+            is_mode = modes == mode
+            out[is_mode] = BC6H_mode(blocks[is_mode], int(mode), signed)
+    # NOTE: pixels are stored row by row, tiles are indexed [x][y]
+    return out.view(np.float16).reshape(-1, 4, 4, 3).transpose(0, 2, 1, 3)
 
 
-# TODO: variants for TYPELESS, UF16 & SF16
-def BC6H(texture: Texture, mip_index: MipIndex = None) -> np.array:
-    """HDR RGB161616 4x4 blocks"""
+def BC6H(texture: Texture, mip_index: MipIndex = None, signed=False) -> np.array:
+    """HDR RGB161616 4x4 blocks; UF16 unless signed (SF16)"""
     if mip_index is None:
         mip_index = texture.default_mip()
     pixel_data = texture.mipmaps[mip_index]
-    tiles = [
-        BC6H_block(pixel_data[i:i + 16])
-        for i in range(0, len(pixel_data), 16)]
+    blocks = np.frombuffer(pixel_data, dtype=np.uint8).reshape(-1, 16)
+    tiles = BC6H_tiles(blocks, signed)
     return concatenate(tiles, *texture.mip_size(mip_index))
@@ -1,9 +1,10 @@
 """PVR twiddle processing"""
 # https://github.com/VincentNLOBJ/pvr2image
-from typing import List
+import functools
 
 import numpy as np
 
+from ..pixels.shuffle_rgb import ARGB16_lut
 from ..textures.base import Face, MipIndex, Texture
 from ..textures import pvr
 
@@ -35,53 +36,37 @@ def iterate(table: np.array = None) -> np.array:
         for row in big_z], axis=0)
 
 
+def spread_bits(v: np.ndarray) -> np.ndarray:
+    """0b1111 -> 0b01010101; interleaves zeros w/ the lowest 16 bits"""
+    v = (v | v << 8) & 0x00FF00FF
+    v = (v | v << 4) & 0x0F0F0F0F
+    v = (v | v << 2) & 0x33333333
+    v = (v | v << 1) & 0x55555555
+    return v
+
+
 # NOTE: the twiddle pattern is a Z-order curve
 # -- a fractal space filling curve
 # -- handy for finding neighbouring pixels
-def detwiddle_lut(width: int, height: int) -> List[int]:
-    """adapted from pvr2image"""
-    if width != height:
-        raise NotImplementedError("Square Images Only")
-    # TODO: landscape & portrait rectangles
-    # lookup table
-    sequence = [2, 6, 2, 22, 2, 6, 2]
-    pattern_a = [
-        *sequence, 86,
-        *sequence, 342,
-        *sequence, 86,
-        *sequence]
-    pattern_b = [
-        1366, 5462, 1366, 21846,
-        1366, 5462, 1366, 87382,
-        1366, 5462, 1366, 21846,
-        1366, 5462, 1366, 349526,
-        1366, 5462, 1366, 21846,
-        1366, 5462, 1366, 87382,
-        1366, 5462, 1366, 21846,
-        1366, 5462, 1366, 349526]
-    row_increments = list()
-    for b in pattern_b:
-        row_increments.extend(pattern_a)
-        row_increments.append(b)
-    row_increments.extend(pattern_a)
-    # square lut
-    slice_ = [*row_increments[0:width - 1], 2]
-    row = list()
-    index = 0
-    for increment in slice_:
-        row.append(index)
-        index += increment
-    column = [
-        x // 2
-        for x in row]
-    return [
-        x + y
-        for x in row
-        for y in column]
+# NOTE: cached since every mip of the same size shares a lut
+@functools.lru_cache(maxsize=8)
+def detwiddle_lut(width: int, height: int) -> np.ndarray:
+    """twiddled index of each pixel, row by row"""
+    # NOTE: sides must be powers of 2
+    # -- rectangles are squares of the shorter side, laid out in order
+    # -- so the leftover bits of the longer side go on top
+    side = min(width, height)
+    bits = side.bit_length() - 1
+    x, y = np.arange(width), np.arange(height)
+    x = spread_bits(x & (side - 1)) | (x >> bits) << (2 * bits)
+    y = spread_bits(y & (side - 1)) << 1 | (y >> bits) << (2 * bits)
+    lut = np.add.outer(y, x).ravel()
+    lut.flags.writeable = False  # shared by the cache
+    return lut
 
 
 def TWIDDLED_to_ORDERED(texture: Texture, mip_index: MipIndex = None) -> bytes:
-    assert isinstance(texture, pvr.PVR)
+    assert isinstance(texture, pvr.Pvr)
 
     if mip_index is None:
         if texture.is_cubemap:
@@ -90,23 +75,9 @@ def TWIDDLED_to_ORDERED(texture: Texture, mip_index: MipIndex = None) -> bytes:
             mip_index = MipIndex(0, 0, None)
     pixel_data = texture.mipmaps[mip_index]
 
-    # ARGB_4444 -> RGBA_8888
+    # NOTE: detwiddle first, so the gather moves 2 bytes per pixel, not 4
     assert texture.format.pixel == pvr.PixelMode.ARGB_4444
-    argb16 = np.frombuffer(pixel_data, dtype=np.uint16)
-    # NOTE: 1 entry per pixel
-    a = (argb16 >> 0x0) & 0x000F
-    r = (argb16 >> 0x4) & 0x000F
-    g = (argb16 >> 0x8) & 0x000F
-    b = (argb16 >> 0xC) & 0x000F
-    rgba32 = np.empty((argb16.size * 4,), dtype=np.uint8)
-    # NOTE: 1 entry per channel
-    rgba32[0::4] = r
-    rgba32[1::4] = g
-    rgba32[2::4] = b
-    rgba32[3::4] = a
-    rgba32 = rgba32 | rgba32 << 4  # 4-bit -> 8-bit
-    raw_bytes = rgba32.tobytes()
-
-    return np.array([
-        raw_bytes[i * 4:(i + 1) * 4]  # index whole pixel
-        for i in detwiddle_lut(*texture.max_size)]).flatten().tobytes()
+    argb16 = np.frombuffer(pixel_data, dtype="<u2")
+    lut = detwiddle_lut(*texture.mip_size(mip_index))
+    # ARGB_4444 -> RGBA_8888
+    return ARGB16_lut()[argb16[lut]].tobytes()
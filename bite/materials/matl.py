@@ -7,6 +7,11 @@ import breki
 from . import base
 
 
+# NOTE: dict lookup instead of `int in base.Slot`
+# -- Enum membership scans every member (& raises TypeError before 3.12)
+slot_from_value = {slot.value: slot for slot in base.Slot}
+
+
 # TODO: FriendlyFile "*.msw" & "*.uber"
 class Matl(base.Material, breki.TextFile):
     exts = ["*.json"]
@@ -25,8 +30,8 @@ class Matl(base.Material, breki.TextFile):
         matl_slot_names = matl_json.get("$textureTypes")
         for key, asset_path in matl_textures.items():
             int_key = int(key)
-            if int_key in base.Slot:
-                slot = base.Slot(int_key)
+            if int_key in slot_from_value:
+                slot = slot_from_value[int_key]
             else:
                 slot = (int_key, matl_slot_names.get(key, None))
             self.textures[slot] = asset_path
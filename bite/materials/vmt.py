@@ -1,6 +1,6 @@
 from __future__ import annotations
 import re
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import breki
 
@@ -33,30 +33,23 @@ texture_parameters = {
 # TODO: Role(enum.Enum)
 
 
-name_patterns = [
-    re.compile(f"{a}(.+){a}")
-    for a in ("'", '"', "")]
+# NOTE: one pattern for the whole line, tried once per line
+# -- key & value are each "quoted", 'quoted' or unquoted
+# -- an unquoted value runs to the end of the line: `$color [1 0 0]`
+key_pattern = r"""\"([^"]*)\"|'([^']*)'|([^\s"']\S*)"""
+value_pattern = r"""\"([^"]*)\"|'([^']*)'|([^\s"'].*)"""
+line_pattern = re.compile(f"(?:{key_pattern})(?:\\s+(?:{value_pattern}))?")
 
 
-def name_of(line: str) -> str:
-    for pattern in name_patterns:
-        match = pattern.match(line)
-        if match is not None:
-            return match.groups()[0]
-
-
-parameter_patterns = [
-    re.compile(f"{a}(.+){a}\\s+{b}(.+){b}")
-    for a in ("'", '"', "")
-    for b in ("'", '"', "")]
-# NOTE: unquoted last since we might accidental match it otherwise
-
-
-def parameter_of(line: str) -> (str, str):
-    for pattern in parameter_patterns:
-        match = pattern.match(line)
-        if match is not None:
-            return match.groups()
+def tokenize(line: str) -> Optional[Tuple[str, Optional[str]]]:
+    """(name, None) or (key, value); None if line can't be tokenized"""
+    match = line_pattern.fullmatch(line)
+    if match is None:
+        return None
+    groups = match.groups()
+    key = next(g for g in groups[:3] if g is not None)
+    value = next((g for g in groups[3:] if g is not None), None)
+    return (key, value)
 
 
 def escape(word: str) -> str:
@@ -73,13 +66,11 @@ class Node:
     name: str
     parameters: Dict[str, str]
     children: List[Node]
-    _line_length: int  # for skipping child node lines
 
     def __init__(self):
         self.name = None
         self.parameters = dict()
         self.children = list()
-        self._line_length = 0
 
     def __repr__(self) -> str:
         descriptor = " ".join([
@@ -89,51 +80,49 @@ class Node:
         return f"<{self.__class__.__name__} {descriptor} @ 0x{id(self):016X}>"
 
     def __str__(self) -> str:
-        indent = "  "
-        lines = [escape(self.name), "{"]
-        parameters = [
-            f"{escape(key)} {escape(value)}"
-            for key, value in self.parameters.items()]
-        lines.extend(f"{indent}{line}" for line in parameters)
-        for child in self.children:
-            lines.extend(
-                f"{indent}{line}"
-                for line in str(child).split("\n"))
-        lines.append("}")
+        lines = list()
+        self.emit(lines)
         return "\n".join(lines)
 
+    def emit(self, lines: List[str], depth: int = 0):
+        """append indented lines to lines; children share the same list"""
+        indent = "  " * depth
+        lines.append(f"{indent}{escape(self.name)}")
+        lines.append(f"{indent}{{")
+        lines.extend(
+            f"{indent}  {escape(key)} {escape(value)}"
+            for key, value in self.parameters.items())
+        for child in self.children:
+            child.emit(lines, depth + 1)
+        lines.append(f"{indent}}}")
+
     @classmethod
-    def from_lines(cls, lines: List[str], prev_line=None) -> Node:
+    def from_iter(cls, lines: Iterator[str], prev_line=None) -> Node:
+        # NOTE: child nodes consume lines from the same iterator
         out = cls()
         if prev_line is not None:
             out.name = prev_line
-        i = 0
-        while i < len(lines):
-            line = lines[i]
+        for line in lines:
             line, sep, comment = line.partition("//")
             line = line.strip()  # no leading / trailing whitespace
-            i += 1
             if line == "{":
                 if out.name is None:  # top node
                     out.name = prev_line
                 else:  # child node
-                    child = Node.from_lines(lines[i:], prev_line)
-                    out.children.append(child)
-                    i += child._line_length
+                    out.children.append(Node.from_iter(lines, prev_line))
             elif line == "}":
-                out._line_length = i
                 return out  # node has been closed
+            elif line == "":
+                continue
             else:
-                parameter = parameter_of(line)
-                name = name_of(line)
-                # NOTE: check for parameters first, names can match parameters
-                if parameter is not None:
-                    key, value = parameter
+                tokens = tokenize(line)
+                if tokens is None:
+                    prev_line = line
+                elif tokens[1] is not None:
+                    key, value = tokens
                     out.parameters[key] = value
-                elif name is not None:
-                    prev_line = name
                 else:
-                    prev_line = line
+                    prev_line = tokens[0]
         # TODO: warn / log instead of throwing an error
         # raise RuntimeError("ran out of lines before node closed")
         return out
@@ -153,7 +142,7 @@ class Vmt(base.Material, breki.TextFile):
             return
         self.is_parsed = True
         # parse root node
-        self._raw = Node.from_lines(self.stream.readlines())
+        self._raw = Node.from_iter(iter(self.stream))
         self.shader = self._raw.name
         # parameters -> textures
         for parameter, role in texture_parameters.items():
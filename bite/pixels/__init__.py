@@ -1,9 +1,10 @@
 __all__ = [
     "base", "shuffle_rgb", "yuv",
     "Channel", "Format",
-    "ARGB16_to_RGBA32",
-    "RGB24_to_RGBA32",
-    "RGB24_to_RGB565", "RGB565_to_RGB24",
+    "ARGB16_to_RGBA32", "ARGB16_to_RGBA32_into",
+    "RGB24_to_RGBA32", "RGB24_to_RGBA32_into",
+    "RGB24_to_RGB565", "RGB24_to_RGB565_into",
+    "RGB565_to_RGB24", "RGB565_to_RGB24_into",
     # "RGB24_to_YUV", "YUV_to_RGB24"
 ]
 
@@ -13,10 +14,10 @@ from . import shuffle_rgb
 
 from .base import Channel, Format
 from .shuffle_rgb import (
-    ARGB16_to_RGBA32,
-    RGB24_to_RGBA32,
-    RGB24_to_RGB565,
-    RGB565_to_RGB24)
+    ARGB16_to_RGBA32, ARGB16_to_RGBA32_into,
+    RGB24_to_RGBA32, RGB24_to_RGBA32_into,
+    RGB24_to_RGB565, RGB24_to_RGB565_into,
+    RGB565_to_RGB24, RGB565_to_RGB24_into)
 # from .yuv import (
 #     RGB24_to_YUV,
 #     YUV_to_RGB24)
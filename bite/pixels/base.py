@@ -1,10 +1,16 @@
 from __future__ import annotations
 import enum
-from typing import Dict, List
+import functools
+import re
+from typing import Dict, List, Tuple
 
 import numpy as np
 
 
+interned_channels = dict()
+# ^ {(Channel, name, bits, char): Channel}
+
+
 class Channel:
     name: str
     char: str
@@ -13,10 +19,26 @@ class Channel:
     # TODO: floating point
     # -- e.g. UF16 (5-bit exponent, 11-bit mantissa)
 
-    def __init__(self, name, bits, char=None):
-        self.name = name
-        self.bits = bits
-        self.char = name[0].upper() if char is None else char
+    # NOTE: Channels are interned; equal Channels are the same object
+    # -- so set() & .index() of Format.channels mostly compare identity
+    # -- shared by every Format, so they're immutable
+    def __new__(cls, name, bits, char=None):
+        char = name[0].upper() if char is None else char
+        key = (cls, name, bits, char)
+        if key not in interned_channels:
+            out = super().__new__(cls)
+            for attr, value in zip(("name", "bits", "char"), (name, bits, char)):
+                object.__setattr__(out, attr, value)
+            object.__setattr__(out, "_hash", hash((name, bits, char)))
+            interned_channels[key] = out
+        return interned_channels[key]
+
+    def __setattr__(self, attr, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    # NOTE: copy & pickle go through __new__, returning the interned Channel
+    def __reduce__(self):
+        return (self.__class__, (self.name, self.bits, self.char))
 
     def __repr__(self) -> str:
         args = [self.name, self.bits]
@@ -26,12 +48,14 @@ class Channel:
         return f"{self.__class__.__name__}({args})"
 
     def __eq__(self, other) -> bool:
+        if self is other:
+            return True
         if isinstance(other, Channel):
             return hash(self) == hash(other)
         return False
 
     def __hash__(self):
-        return hash((self.name, self.bits, self.char))
+        return self._hash
 
     @property
     def mask(self) -> int:
@@ -52,6 +76,62 @@ class Channel:
         return out
 
 
+def expand(c: np.array, bits: int, out_bits: int) -> np.array:
+    """repeat the bits of c until they fill out_bits; e.g. 0b101 -> 0b10110110"""
+    out = np.zeros_like(c)
+    shift = out_bits
+    while shift > 0:
+        shift -= bits
+        out |= (c << shift) if shift >= 0 else (c >> -shift)
+    return out
+
+
+def unpack(array: np.array, channels: Tuple[Channel]) -> List[np.array]:
+    """split packed pixels into 1 array per channel"""
+    # NOTE: first channel is in the highest bits
+    max_bits = max(channel.bits for channel in channels)
+    dtype = {8: np.uint8, 16: np.uint16, 32: np.uint32}[
+        min(b for b in (8, 16, 32) if b >= max_bits)]
+    out = list()
+    offset = 0
+    # NOTE: one scratch buffer, shifted & masked in place, for every channel
+    c = np.empty_like(array)
+    for channel in reversed(channels):
+        np.right_shift(array, offset, out=c)
+        np.bitwise_and(c, channel.mask, out=c)
+        column = c.astype(dtype)
+        if channel.bits not in (8, 16, 32):
+            column = expand(column, channel.bits, max_bits)
+        out.append(column)
+        offset += channel.bits
+    return out[::-1]
+
+
+# NOTE: 8 & 16 bpp formats only have 256 / 65536 possible pixels
+# -- so unpack them all once & decode w/ 1 lookup per pixel per channel
+@functools.lru_cache(maxsize=8)
+def unpack_lut(channels: Tuple[Channel], dtype: np.dtype) -> np.array:
+    """unpack() for every possible pixel; 1 row per channel"""
+    all_pixels = np.arange(np.iinfo(dtype).max + 1, dtype=dtype)
+    lut = np.stack(unpack(all_pixels, channels))
+    lut.flags.writeable = False  # shared by the cache
+    return lut
+
+
+# NOTE: cached; swizzles tend to be repeated (e.g. BGRA -> RGBA per mipmap)
+@functools.lru_cache(maxsize=64)
+def shuffle_order(old: Tuple[Channel], new: Tuple[Channel]) -> Tuple[int]:
+    """index of each new channel in old"""
+    assert set(old) == set(new)
+    return tuple(old.index(channel) for channel in new)
+
+
+# "RGB_565" -> ("RGB", "565")
+format_name = re.compile(r"([A-Z]+)_([0-9]+)")
+channel_names = {"R": "red", "G": "green", "B": "blue", "A": "alpha"}
+# NOTE: any other char becomes a channel w/ that name (e.g. "Y" -> "y")
+
+
 class Stride(enum.Enum):
     """Format.dtype stride"""
     PIXEL = 0
@@ -60,25 +140,52 @@ class Stride(enum.Enum):
 
 # NOTE: many Formats will have OpenGL internalformat equivalents
 class Format:  # for pixel arrays
-    channels: List[Channel]
+    channels: Tuple[Channel]
     stride: Stride
     dtype: np.dtype
+    # NOTE: channels are fixed, so every derived property is cached
+    # -- tuple of channels also doubles as a key for unpack_lut
+    # NOTE: immutable, since from_name() shares one instance per name
 
     def __init__(self, **channels):
-        self.channels = [
+        channels = tuple(
             Channel(name, size)
-            for name, size in channels.items()]
-        self.dtype, self.stride = self.parser_for(self.channels)
+            for name, size in channels.items())
+        dtype, stride = self.parser_for(channels)
+        for attr, value in zip(("channels", "dtype", "stride"), (channels, dtype, stride)):
+            object.__setattr__(self, attr, value)
+
+    def __setattr__(self, attr, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
 
     def __repr__(self) -> str:
         return f"<PixelFormat {self.name}>"
 
-    @property
+    @functools.cached_property
     def is_uniform(self) -> bool:
         return len(set(channel.bits for channel in self.channels)) == 1
 
+    # NOTE: cached; Formats are immutable, so those of the same name are interchangeable
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def from_name(cls, name: str) -> Format:
+        """"RGB_565" -> Format(red=5, green=6, blue=5)"""
+        match = format_name.fullmatch(name)
+        if match is None:
+            raise ValueError(f"invalid Format name: {name!r}")
+        chars, bits = match.groups()
+        if len(bits) % len(chars) != 0:
+            raise ValueError(f"cannot split {bits!r} between {chars!r}")
+        width = len(bits) // len(chars)  # e.g. "RGBA_16161616"
+        channels = {
+            channel_names.get(char, char.lower()): int(bits[i * width:(i + 1) * width])
+            for i, char in enumerate(chars)}
+        if len(channels) != len(chars):
+            raise ValueError(f"repeated channel in {name!r}")
+        return cls(**channels)
+
     @staticmethod
-    def parser_for(channels: List[Channel]) -> (np.dtype, Stride):
+    def parser_for(channels: Tuple[Channel]) -> (np.dtype, Stride):
         dtypes = {32: np.uint32, 16: np.uint16, 8: np.uint8}
         channel_bits = [channel.bits for channel in channels]
         bpp = sum(channel_bits)
@@ -91,7 +198,7 @@ class Format:  # for pixel arrays
         else:
             raise RuntimeError("cannot parse channels as array")
 
-    @property
+    @functools.cached_property
     def name(self) -> str:
         chars, bits = "", ""
         for channel in self.channels:
@@ -99,7 +206,7 @@ class Format:  # for pixel arrays
             bits += str(channel.bits)
         return f"{chars}_{bits}"
 
-    @property
+    @functools.cached_property
     def channel(self) -> Dict[str, Channel]:
         out = {
             channel.name: channel
@@ -109,14 +216,19 @@ class Format:  # for pixel arrays
             for channel in self.channels})
         return out
 
-    @property
+    @functools.cached_property
     def bits_per_pixel(self) -> int:
         return sum(channel.bits for channel in self.channels)
 
-    @property
+    @functools.cached_property
     def bytes_per_pixel(self) -> float:
         return self.bits_per_pixel / 8
 
+    @functools.cached_property
+    def max_bits(self) -> int:
+        """bits in the widest channel"""
+        return max(channel.bits for channel in self.channels)
+
     # TODO: pack / unpack channel
 
     def array_from(self, raw_pixels: bytes) -> np.array:
@@ -125,43 +237,38 @@ class Format:  # for pixel arrays
         num_pixels = (len(raw_pixels) * 8) // self.bits_per_pixel
         array = np.frombuffer(raw_pixels, self.dtype)
         if self.stride == Stride.PIXEL:
-            # split into 1 dtype per channel
             assert array.size == num_pixels
-            max_bits = max(channel.bits for channel in self.channels)
-            dtypes = {
-                0 < max_bits <= 8: (np.uint8, 0xFF),
-                8 < max_bits <= 16: (np.uint16, 0xFFFF),
-                16 < max_bits <= 32: (np.uint32, 0xFFFFFFFF)}
-            dtype, mask = dtypes[True]
-            out = np.empty((num_pixels * len(self.channels),), dtype=dtype)
-            offset = 0
-            i = num_channels
-            for channel in reversed(self.channels):
-                c = (array >> offset) & ((1 << channel.bits) - 1)
-                if channel.bits not in (8, 16, 32):
-                    c = (c | c << (max_bits - channel.bits)) & mask
-                out[i::num_channels] = c
-                offset += channel.bits
-                i -= 1
-            array = out
+            if self.dtype in (np.uint8, np.uint16):  # 1 lookup per pixel
+                return unpack_lut(self.channels, self.dtype).T[array]
+            return np.stack(unpack(array, self.channels), axis=1)
         return array.reshape((num_pixels, num_channels))
 
+    def channels_from(self, raw_pixels: bytes) -> Dict[str, np.array]:
+        """b"rgbrgb" -> {"red": [r, r], "green": [g, g], "blue": [b, b]}"""
+        array = np.frombuffer(raw_pixels, self.dtype)
+        if self.stride == Stride.PIXEL:
+            if self.dtype in (np.uint8, np.uint16):  # 1 lookup per pixel
+                columns = unpack_lut(self.channels, self.dtype)[:, array]
+            else:
+                columns = unpack(array, self.channels)
+        else:  # NOTE: strided views; no copy
+            columns = array.reshape((-1, len(self.channels))).T
+        return {
+            channel.name: column
+            for channel, column in zip(self.channels, columns)}
+
     def bytes_from(self, array: np.array) -> bytes:
-        return array.flatten().tobytes()
+        return array.tobytes()  # always C order; no need to flatten first
 
     # TODO: add / remove alpha
     # -- assert "alpha" in channel[-1].name.lower()
 
     # NOTE: faster than matmul & doesn't edit input dtype
-    def shuffle(self, pixels: np.array, new: Format) -> bytes:
+    def shuffle(self, pixels: np.array, new: Format) -> np.array:
         assert self.dtype == new.dtype
         assert self.stride == new.stride
-        assert set(self.channels) == set(new.channels)
-        pixels = pixels.transpose()
-        pixels = np.array([
-            pixels[self.channels.index(channel)]
-            for channel in new.channels])
-        return pixels.transpose()
+        order = shuffle_order(self.channels, new.channels)
+        return pixels[:, order]  # 1 copy
 
 
 class Layout(enum.Enum):
@@ -184,43 +291,90 @@ class Layout(enum.Enum):
 
 # TODO: numpy.matmul colour space transforms
 class Array:
-    array: np.array
+    channels: Dict[str, np.array]
+    # ^ {channel.name: 1 value per pixel}
     format: Format
     layout = Layout.PIXEL
     # TODO: support more complex layouts
     # -- will probably require width & height
     # NOTE: sampling might be less memory intensive
     # -- uv coords range -> block(s) -> raw_pixels slices
+    # NOTE: 1 array per channel, so shuffles & single channel edits are cheap
+    # -- .array interleaves them for anything that wants (N, C) pixels
 
     def __init__(self, fmt, array):
+        if not isinstance(array, np.ndarray):
+            raise TypeError(f"expected an (N, C) np.ndarray, not {type(array).__name__}")
         self.format = fmt
         self.array = array
 
     def __repr__(self) -> str:
-        descriptor = f"{self.format.name} {len(self.array)} pixels"
+        descriptor = f"{self.format.name} {len(self)} pixels"
         return f"<{self.__class__.__name__} {descriptor} @ 0x{id(self):016X}>"
 
+    def __len__(self) -> int:
+        return len(self.channels[self.format.channels[0].name])
+
+    @property
+    def array(self) -> np.array:
+        """[[r, g, b], [r, g, b]]"""
+        return np.stack([
+            self.channels[channel.name]
+            for channel in self.format.channels], axis=1)
+
+    @array.setter
+    def array(self, array: np.array):
+        # NOTE: channels are views of array's columns; no copy
+        self.channels = {
+            channel.name: array[:, i]
+            for i, channel in enumerate(self.format.channels)}
+
     def as_bytes(self) -> bytes:
-        pixels = np.array(
-            list(map(self.format.pack, self.array)),
-            dtype=self.format.dtype)
-        return pixels.flatten().tobytes()
+        if self.format.stride == Stride.CHANNEL:
+            return self.array.astype(self.format.dtype).tobytes()
+        # NOTE: packs every pixel at once, one channel at a time
+        # -- first channel ends up in the highest bits, like .array_from()
+        max_bits = self.format.max_bits
+        pixels = np.zeros((len(self),), dtype=self.format.dtype)
+        for channel in self.format.channels:
+            c = self.channels[channel.name].astype(self.format.dtype)
+            if channel.bits not in (8, 16, 32):  # narrow back down
+                c = c >> (max_bits - channel.bits)
+            pixels = (pixels << channel.bits) | (c & channel.mask)
+        return pixels.tobytes()
 
     # e.g. RGB_to_YUV_matrix, YUV_888
     def shift(self, matrix: np.array, out_fmt: Format):
         """linear transformation between colour spaces via matrix"""
         num_channels = len(self.format.channels)
-        assert matrix.size == (num_channels, num_channels)
+        assert matrix.shape == (num_channels, num_channels)
         assert len(out_fmt.channels) == num_channels
         # new_pixel = matrix * old_pixel
-        array = np.matmul(matrix, self.array.transpose()).transpose()
-        return Array(out_fmt, array)
+        channels = np.matmul(matrix, self.array.T)
+        return Array.from_channels(out_fmt, {
+            channel.name: column
+            for channel, column in zip(out_fmt.channels, channels)})
 
     def shuffle(self, fmt: Format) -> Array:
-        array = self.Format.shuffle(self.array, fmt)
-        return Array(fmt, array)
+        """reorder channels; no pixels are copied"""
+        assert set(self.format.channels) == set(fmt.channels)
+        return Array.from_channels(fmt, {
+            channel.name: self.channels[channel.name]
+            for channel in fmt.channels})
 
     @classmethod
-    def from_bytes(cls, fmt: Format, raw_pixels: bytes) -> Array:
-        array = fmt.array_from(raw_pixels)
+    def from_array(cls, fmt: Format, array: np.array) -> Array:
+        """(N, C) pixels -> Array; channels are views of array"""
         return cls(fmt, array)
+
+    @classmethod
+    def from_channels(cls, fmt: Format, channels: Dict[str, np.array]) -> Array:
+        """{channel.name: 1 value per pixel} -> Array; no copy"""
+        out = cls.__new__(cls)
+        out.format = fmt
+        out.channels = channels
+        return out
+
+    @classmethod
+    def from_bytes(cls, fmt: Format, raw_pixels: bytes) -> Array:
+        return cls.from_channels(fmt, fmt.channels_from(raw_pixels))
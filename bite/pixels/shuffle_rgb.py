@@ -1,50 +1,98 @@
+import functools
+
 import numpy as np
 
 
+# NOTE: 16bpp formats only have 65536 possible pixels; convert them all once
+# -- tables are built on first use (192KB & 256KB)
+@functools.lru_cache(maxsize=None)
+def ARGB16_lut() -> np.array:
+    """RGBA32 pixel (as <u4) for every ARGB16 pixel"""
+    argb = np.arange(0x10000, dtype="<u4")
+    # NOTE: alpha is in the lowest nibble
+    rgba = (
+        ((argb >> 0x04) & 0x0000000F)  # r
+        | (argb & 0x00000F00)  # g
+        | ((argb << 0x04) & 0x000F0000)  # b
+        | ((argb & 0x0000000F) << 0x18))  # a
+    rgba |= rgba << 4  # 4-bit -> 8-bit
+    rgba.flags.writeable = False  # shared by the cache
+    return rgba
+
+
+@functools.lru_cache(maxsize=None)
+def RGB565_lut() -> np.array:
+    """RGB24 pixel for every RGB565 pixel; (65536, 3)"""
+    rgb565 = np.arange(0x10000, dtype=np.uint16)
+    r = (rgb565 >> 0xB) & 0x1F
+    g = (rgb565 >> 0x5) & 0x3F
+    b = (rgb565 >> 0x0) & 0x1F
+    rgb24 = np.stack([
+        r << 3 | r >> 2,
+        g << 2 | g >> 4,
+        b << 3 | b >> 2], axis=1).astype(np.uint8)
+    rgb24.flags.writeable = False  # shared by the cache
+    return rgb24
+
+
+# NOTE: np.frombuffer(raw, rgb24_pixel) is already (N, 3); no reshape needed
+rgb24_pixel = np.dtype((np.uint8, 3))
+
+
+# NOTE: each conversion has an *_into variant that writes to a preallocated
+# -- (num_pixels, bytes_per_pixel) uint8 array; e.g. one slice per mipmap
+# -- the plain versions allocate that array themselves & return bytes
+
+
 # TODO: inverse
+def ARGB16_to_RGBA32_into(raw_pixels: bytes, out: np.array):
+    argb16 = np.frombuffer(raw_pixels, dtype="<u2")
+    np.take(ARGB16_lut(), argb16, out=out.view("<u4")[:, 0])
+
+
 def ARGB16_to_RGBA32(raw_pixels: bytes) -> bytes:
-    argb16 = np.frombuffer(raw_pixels, dtype=np.uint16)
-    a = (argb16 >> 0x0) & 0x000F
-    r = (argb16 >> 0x4) & 0x000F
-    g = (argb16 >> 0x8) & 0x000F
-    b = (argb16 >> 0xC) & 0x000F
-    rgba32 = np.empty((argb16.size * 4,), dtype=np.uint8)
-    rgba32[0::4] = r
-    rgba32[1::4] = g
-    rgba32[2::4] = b
-    rgba32[3::4] = a
-    rgba32 = rgba32 | rgba32 << 4  # 4-bit -> 8-bit
-    return rgba32.tobytes()
+    out = np.empty((len(raw_pixels) // 2, 4), dtype=np.uint8)
+    ARGB16_to_RGBA32_into(raw_pixels, out)
+    return out.tobytes()
+
+
+def RGB24_to_RGB565_into(raw_pixels: bytes, out: np.array):
+    rgb24 = np.frombuffer(raw_pixels, dtype=rgb24_pixel)
+    # NOTE: pad to 32-bit words so each pixel is read in one go
+    rgbx32 = np.zeros((len(rgb24), 4), dtype=np.uint8)
+    rgbx32[:, :3] = rgb24
+    rgbx32 = rgbx32.view("<u4").ravel()  # 0xXXBBGGRR
+    # NOTE: shift each channel's top 5 / 6 / 5 bits straight into place
+    out.view(np.uint16)[:, 0] = (
+        ((rgbx32 << 0x08) & 0xF800)  # r
+        | ((rgbx32 >> 0x05) & 0x07E0)  # g
+        | ((rgbx32 >> 0x13) & 0x001F))  # b
 
 
 def RGB24_to_RGB565(raw_pixels: bytes) -> bytes:
-    rgb24 = np.frombuffer(raw_pixels, dtype=np.uint8)
-    r = rgb24[0::3]
-    g = rgb24[1::3]
-    b = rgb24[2::3]
-    rgb565 = np.empty((rgb24.size // 3,), dtype=np.uint16)
-    rgb565 = r << 0xB | g << 0x5 | b << 0x0
-    return rgb565.tobytes()
+    out = np.empty((len(raw_pixels) // 3, 2), dtype=np.uint8)
+    RGB24_to_RGB565_into(raw_pixels, out)
+    return out.tobytes()
 
 
-def RGB565_to_RGB24(raw_pixels: bytes) -> bytes:
+def RGB565_to_RGB24_into(raw_pixels: bytes, out: np.array):
     rgb565 = np.frombuffer(raw_pixels, dtype=np.uint16)
-    r = (rgb565 >> 0xB) & 0x1F
-    g = (rgb565 >> 0x5) & 0x3F
-    b = (rgb565 >> 0x0) & 0x1F
-    r = r << 3 | r >> 2
-    g = g << 2 | g >> 4
-    b = b << 3 | b >> 2
-    rgb24 = np.empty((rgb565.size * 3,), dtype=np.uint8)
-    rgb24[0::3] = r
-    rgb24[1::3] = g
-    rgb24[2::3] = b
-    return rgb24.tobytes()
+    np.take(RGB565_lut(), rgb565, axis=0, out=out)
+
+
+def RGB565_to_RGB24(raw_pixels: bytes) -> bytes:
+    out = np.empty((len(raw_pixels) // 2, 3), dtype=np.uint8)
+    RGB565_to_RGB24_into(raw_pixels, out)
+    return out.tobytes()
 
 
 # TODO: inverse
-def RGB24_to_RGBA32(raw_pixel: bytes) -> bytes:
-    rgb24 = np.frombuffer(raw_pixel, dtype=np.uint8)
-    rgb24 = rgb24.reshape(rgb24.size // 3, 3)
-    rgba32 = np.insert(rgb24, 3, 0xFF, axis=1).flatten()
-    return rgba32.tobytes()
+def RGB24_to_RGBA32_into(raw_pixels: bytes, out: np.array):
+    out[:, :3] = np.frombuffer(raw_pixels, dtype=rgb24_pixel)
+    out[:, 3] = 0xFF
+
+
+def RGB24_to_RGBA32(raw_pixels: bytes) -> bytes:
+    out = np.empty((len(raw_pixels) // 3, 4), dtype=np.uint8)
+    RGB24_to_RGBA32_into(raw_pixels, out)
+    return out.tobytes()
@@ -1,12 +1,14 @@
 # https://gist.github.com/leon-nn/cd4e3d50eb0fa23d8e197102f49f2cb3
 # https://learnopengl.com
+import concurrent.futures
+import ctypes
+import functools
 import os
-from typing import Dict, List, Tuple, Union
+from typing import Any, Callable, Dict, FrozenSet, List, Tuple, Union
 
 import numpy as np
 from OpenGL.error import GLError
 import OpenGL.GL as gl
-import OpenGL.GLUT as glut
 
 from ..textures.base import Size
 
@@ -16,6 +18,21 @@ ShaderDict = Dict[str, str]
 Vertices = List[Union[float, int]]
 Attrib = Tuple[int, int, bool]
 # ^ (gl.GL_TYPE, count, should_normalise)
+Geo = Tuple[int, Tuple[int, ...], int, int]
+# ^ (vertex_array, vertex_buffers, index_buffer, num_indices)
+
+gl_type_size = {
+    gl.GL_FLOAT: 4,
+    gl.GL_HALF_FLOAT: 2,
+    gl.GL_UNSIGNED_BYTE: 1}
+# ^ {gl.GL_TYPE: bytes}
+
+
+def create_name(gl_create, *args) -> int:
+    """single object name from a DSA glCreate* function"""
+    names = np.zeros(1, dtype=np.uint32)
+    gl_create(*args, 1, names)
+    return int(names[0])
 
 
 class ContextSpec:
@@ -26,7 +43,10 @@ class ContextSpec:
     vendor: str
     hardware: str  # GL_RENDERER
     extensions: List[str]
-    glsl_versions: List[str]
+    # glsl_versions: List[str]  # cached_property
+    # NOTE: frozensets for O(1) has_extension & supports_glsl lookups
+    _extension_set: FrozenSet[str]
+    # _glsl_set: FrozenSet[str]  # cached_property
     # NOTE: GLSL 1.00 uses an empty string for version
     # -- this is because "#version" declarations were added in 1.10
     # -- "100" is used for GLSL ES 1.00; there is no "100 es"
@@ -42,16 +62,24 @@ class ContextSpec:
         self.extensions = [
             gl.glGetStringi(gl.GL_EXTENSIONS, i).decode()
             for i in range(gl.glGetIntegerv(gl.GL_NUM_EXTENSIONS))]
+        self._extension_set = frozenset(self.extensions)
+
+    # NOTE: only queried when first needed; the context must still be active
+    @functools.cached_property
+    def glsl_versions(self) -> List[str]:
+        out = list()
         # NOTE: ARB_shading_language_100 recommends looping until INVALID_ENUM
-        self.glsl_versions = list()
         i = 0
         while True:
             try:
-                self.glsl_versions.append(
-                    gl.glGetStringi(gl.GL_SHADING_LANGUAGE_VERSION, i).decode())
+                out.append(gl.glGetStringi(gl.GL_SHADING_LANGUAGE_VERSION, i).decode())
                 i += 1
             except GLError:
-                break  # INVALID_ENUM; reached last version
+                return out  # INVALID_ENUM; reached last version
+
+    @functools.cached_property
+    def _glsl_set(self) -> FrozenSet[str]:
+        return frozenset(self.glsl_versions)
 
     def __repr__(self) -> str:
         version = f"OpenGL {self.major}.{self.minor}"
@@ -60,7 +88,7 @@ class ContextSpec:
         return f"<{self.__class__.__name__} {version} | {extensions} | {glsl}>"
 
     def has_extension(self, extension: str) -> bool:
-        return extension in self.extensions
+        return extension in self._extension_set
 
     def matches_version(self, major, minor) -> bool:
         if self.major == major:
@@ -70,7 +98,70 @@ class ContextSpec:
         return False
 
     def supports_glsl(self, glsl_version: str) -> bool:
-        return glsl_version in self.glsl_versions
+        return glsl_version in self._glsl_set
+
+
+# NOTE: creating a window is the slowest part of a Renderer's setup
+# -- so every Renderer shares the same hidden window & context
+@functools.lru_cache(maxsize=None)
+def gl_context() -> Tuple[int, ContextSpec]:
+    """-> (glut_window, context_spec)"""
+    # NOTE: GLUT is only needed here; importing it also loads the system's GLUT library
+    import OpenGL.GLUT as glut
+    glut.glutInit()
+    window = glut.glutCreateWindow("GLUT")
+    glut.glutHideWindow()
+    return window, ContextSpec()
+
+
+# NOTE: shared by every texture w/ the same settings; set up once per context
+@functools.lru_cache(maxsize=None)
+def sampler(filter_: int, wrap: int) -> int:
+    """sampler object; overrides the filter & wrap params of the texture it's bound with"""
+    out = create_name(gl.glCreateSamplers)
+    gl.glSamplerParameteri(out, gl.GL_TEXTURE_MAG_FILTER, filter_)
+    gl.glSamplerParameteri(out, gl.GL_TEXTURE_MIN_FILTER, filter_)
+    gl.glSamplerParameteri(out, gl.GL_TEXTURE_WRAP_S, wrap)
+    gl.glSamplerParameteri(out, gl.GL_TEXTURE_WRAP_T, wrap)
+    return out
+
+
+# NOTE: shared by every Renderer's draw_async
+@functools.lru_cache(maxsize=None)
+def worker_pool() -> concurrent.futures.ThreadPoolExecutor:
+    return concurrent.futures.ThreadPoolExecutor(max_workers=2)
+
+
+def upload_geo(attrib_arrays: List[np.array], attribs: List[Attrib], indices: np.array) -> Geo:
+    """upload geometry w/ one vertex buffer per attrib"""
+    # NOTE: separate streams; each attrib is fetched contiguously, not strided
+    vertex_array = create_name(gl.glCreateVertexArrays)
+    vertex_buffers = list()
+    for i, (array, (type_, size, normalise)) in enumerate(zip(attrib_arrays, attribs)):
+        vertex_buffer = create_name(gl.glCreateBuffers)
+        gl.glNamedBufferData(vertex_buffer, array.nbytes, array, gl.GL_STATIC_DRAW)
+        vertex_buffers.append(vertex_buffer)
+        # binding i <- vertex_buffer; attrib i <- binding i
+        stride = gl_type_size[type_] * size
+        gl.glVertexArrayVertexBuffer(vertex_array, i, vertex_buffer, 0, stride)
+        normalise = gl.GL_TRUE if normalise else gl.GL_FALSE
+        gl.glEnableVertexArrayAttrib(vertex_array, i)
+        gl.glVertexArrayAttribFormat(vertex_array, i, size, type_, normalise, 0)
+        gl.glVertexArrayAttribBinding(vertex_array, i, i)
+    index_buffer = create_name(gl.glCreateBuffers)
+    gl.glNamedBufferData(index_buffer, indices.nbytes, indices, gl.GL_STATIC_DRAW)
+    gl.glVertexArrayElementBuffer(vertex_array, index_buffer)
+    return vertex_array, tuple(vertex_buffers), index_buffer, indices.size
+
+
+# NOTE: identical for every Renderer; uploaded once to the shared context
+@functools.lru_cache(maxsize=None)
+def fullscreen_quad() -> Geo:
+    positions = np.array(
+        [-1, -1, +1, -1, +1, +1, -1, +1], dtype=np.float32)
+    attribs = [(gl.GL_FLOAT, 2, False)]
+    indices = np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32)
+    return upload_geo([positions], attribs, indices)
 
 
 class Renderer:
@@ -80,7 +171,8 @@ class Renderer:
     window: int
     # geo
     index_buffer: int
-    vertex_buffer: int
+    vertex_buffers: Tuple[int, ...]  # 1 per attrib
+    vertex_array: int
     # rendering
     gl_texture: int
     shader: int
@@ -88,6 +180,13 @@ class Renderer:
     depth_buffer: int
     frame_buffer: int
     render_texture: int
+    # readback
+    pixel_buffers: List[int]  # 3; so a pending & a returned buffer are never reused
+    mapped_pixels: List[np.array]  # persistently mapped view of each pixel_buffer
+    fences: List[Any]  # GLsync per pixel_buffer; None if idle
+    pending_index: Union[None, int]  # queued by draw_pipelined(), not yet read
+    returned_index: Union[None, int]  # last handed out by draw_pipelined() / read_pending()
+    size: Size
 
     def __init__(self, size, vertices, attribs, indices, shaders):
         # spec: ContextSpec
@@ -97,11 +196,10 @@ class Renderer:
         # indices: List[int]
         # shaders: ShaderDict
         # setup gl context
-        glut.glutInit()
-        self.window = glut.glutCreateWindow("GLUT")
-        glut.glutHideWindow()
-        self.context = ContextSpec()
+        self.window, self.context = gl_context()
         # TODO: check context has all the features we want
+        if not self.context.matches_version(4, 5):
+            raise RuntimeError("Renderer requires OpenGL 4.5 (Direct State Access)")
         # basic gl config
         gl.glViewport(0, 0, *size)
         gl.glClearColor(1, 0, 1, 1)
@@ -110,69 +208,58 @@ class Renderer:
         gl.glFrontFace(gl.GL_CW)
         # complex gl config
         self.init_framebuffer(size)
+        self.init_pixel_buffer(size)
         self.init_geo(vertices, attribs, indices)
         self.init_shaders(shaders)
 
     def init_framebuffer(self, size: Size):
-        # create & bind frame buffer
-        self.frame_buffer = gl.glGenFramebuffers(1)
-        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.frame_buffer)
+        # NOTE: Direct State Access (OpenGL 4.5); no binding required to edit
+        self.frame_buffer = create_name(gl.glCreateFramebuffers)
         # colour texture
-        self.render_texture = gl.glGenTextures(1)
-        gl.glBindTexture(gl.GL_TEXTURE_2D, self.render_texture)
-        gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGB, *size, 0, gl.GL_RGB, gl.GL_UNSIGNED_BYTE, None)
-        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
-        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
-        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)  # unbind
-        # link to framebuffer
-        gl.glFramebufferTexture2D(gl.GL_FRAMEBUFFER, gl.GL_COLOR_ATTACHMENT0, gl.GL_TEXTURE_2D, self.render_texture, 0)
+        self.render_texture = create_name(gl.glCreateTextures, gl.GL_TEXTURE_2D)
+        gl.glTextureStorage2D(self.render_texture, 1, gl.GL_RGB8, *size)
+        gl.glTextureParameteri(self.render_texture, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
+        gl.glTextureParameteri(self.render_texture, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
+        gl.glNamedFramebufferTexture(self.frame_buffer, gl.GL_COLOR_ATTACHMENT0, self.render_texture, 0)
         # depth buffer
-        self.depth_buffer = gl.glGenRenderbuffers(1)
-        gl.glBindRenderbuffer(gl.GL_RENDERBUFFER, self.depth_buffer)
-        gl.glRenderbufferStorage(gl.GL_RENDERBUFFER, gl.GL_DEPTH_COMPONENT, *size)
-        gl.glBindRenderbuffer(gl.GL_RENDERBUFFER, 0)  # unbind
-        # link to framebuffer
-        gl.glFramebufferRenderbuffer(gl.GL_FRAMEBUFFER, gl.GL_DEPTH_ATTACHMENT, gl.GL_RENDERBUFFER, self.depth_buffer)
+        self.depth_buffer = create_name(gl.glCreateRenderbuffers)
+        gl.glNamedRenderbufferStorage(self.depth_buffer, gl.GL_DEPTH_COMPONENT, *size)
+        gl.glNamedFramebufferRenderbuffer(
+            self.frame_buffer, gl.GL_DEPTH_ATTACHMENT, gl.GL_RENDERBUFFER, self.depth_buffer)
         # confirm framebuffer is complete
-        status = gl.glCheckFramebufferStatus(gl.GL_FRAMEBUFFER)
+        status = gl.glCheckNamedFramebufferStatus(self.frame_buffer, gl.GL_FRAMEBUFFER)
         if status != gl.GL_FRAMEBUFFER_COMPLETE:
             # NOTE: this is bad, the GPU can't handle this config!
             raise RuntimeError(f"init_framebuffer failed: {status}")
         # bind framebuffer so we can draw to it
         gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.frame_buffer)
 
+    def init_pixel_buffer(self, size: Size):
+        # NOTE: glReadPixels into a PBO returns immediately
+        # -- a fence marks when the copy has finished
+        # NOTE: buffers are mapped once, for the Renderer's lifetime (ARB_buffer_storage)
+        self.size = size
+        width, height = size
+        nbytes = width * height * 3
+        flags = gl.GL_MAP_READ_BIT | gl.GL_MAP_PERSISTENT_BIT | gl.GL_MAP_COHERENT_BIT
+        self.pixel_buffers = [create_name(gl.glCreateBuffers) for i in range(3)]
+        self.mapped_pixels = list()
+        for pixel_buffer in self.pixel_buffers:
+            gl.glNamedBufferStorage(pixel_buffer, nbytes, None, flags)
+            address = gl.glMapNamedBufferRange(pixel_buffer, 0, nbytes, flags)
+            mapped = np.frombuffer((ctypes.c_uint8 * nbytes).from_address(address), dtype=np.uint8)
+            mapped.flags.writeable = False  # written by the GPU
+            self.mapped_pixels.append(mapped)
+        self.fences = [None] * len(self.pixel_buffers)
+        self.pending_index = None
+        self.returned_index = None
+
     def init_geo(self, vertices: Vertices, atrribs: List[Attrib], indices: List[int]):
         # hardcoded fullscreen quad
-        vertices = np.array(
-            [-1, -1, +1, -1, +1, +1, -1, +1], dtype=np.float32)
-        attribs = [(gl.GL_FLOAT, 2, False)]
-        indices = np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32)
-        self.num_indices = indices.size
-        # buffer data
-        vertex_buffer, index_buffer = gl.glGenBuffers(2)
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, vertex_buffer)
-        gl.glBufferData(gl.GL_ARRAY_BUFFER, len(vertices.tobytes()), vertices, gl.GL_STATIC_DRAW)
-        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, index_buffer)
-        gl.glBufferData(gl.GL_ELEMENT_ARRAY_BUFFER, len(indices.tobytes()), indices, gl.GL_STATIC_DRAW)
-        # vertex attribs
-        type_size = {
-            gl.GL_FLOAT: 4}
-        span = sum(
-            type_size[type_] * size
-            for type_, size, normalise in attribs)
-        offset = 0
-        for i, spec in enumerate(attribs):
-            type_, size, normalise = spec
-            normalise = (gl.GL_FALSE, gl.GL_TRUE)[normalise]
-            gl.glEnableVertexAttribArray(i)
-            # NOTE: PyOpenGL fails: "no valid context"
-            # -- https://github.com/pygame/pygame/issues/3110
-            # -- context can be 0 on wayland
-            # -- editted PyOpenGL manually to fix this for now
-            # -- might need to make a fork / PR
-            gl.glVertexAttribPointer(i, size, type_, normalise, span, gl.GLvoidp(offset))
-            offset += type_size[type_] * size
-        # NOTE: don't unbind anything
+        geo = fullscreen_quad()
+        self.vertex_array, self.vertex_buffers, self.index_buffer, self.num_indices = geo
+        # NOTE: leave bound for draw()
+        gl.glBindVertexArray(self.vertex_array)
 
     def init_shaders(self, shaders: ShaderDict):
         # NOTE: just doing vertex and fragment stages for now
@@ -191,8 +278,9 @@ class Renderer:
         self.shader = gl.glCreateProgram()
         for type_, filename, stage in stages:
             path = os.path.join(shader_dir, filename)
-            with open(path) as glsl_file:
-                gl.glShaderSource(stage, glsl_file.read())
+            # NOTE: PyOpenGL takes bytes; skips a decode & re-encode
+            with open(path, "rb") as glsl_file:
+                gl.glShaderSource(stage, [glsl_file.read()])
             gl.glCompileShader(stage)
             compiled = gl.glGetShaderiv(stage, gl.GL_COMPILE_STATUS)
             if compiled == gl.GL_FALSE:
@@ -216,12 +304,95 @@ class Renderer:
         # NOTE: it'd be cool to get the ProgramBinary
         # -- haven't been able to pull it off yet though
 
-    def draw(self) -> np.array:
+    def bind(self):
+        """make this Renderer's objects current"""
+        # NOTE: Renderers share a context, so another may have bound its own since
+        # -- the vertex array holds the geometry's format & buffers; one call
+        gl.glViewport(0, 0, *self.size)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.frame_buffer)
+        gl.glBindVertexArray(self.vertex_array)
+        gl.glUseProgram(self.shader)
+
+    def queue_readback(self, index: int):
+        """draw & copy the framebuffer to pixel_buffers[index] w/o waiting on the GPU"""
+        self.bind()
         # draw
         gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
         gl.glDrawElements(gl.GL_TRIANGLES, self.num_indices, gl.GL_UNSIGNED_INT, gl.GLvoidp(0))
         # export renderbuffer colour
         gl.glPixelStorei(gl.GL_PACK_ALIGNMENT, 1)
         gl.glReadBuffer(gl.GL_COLOR_ATTACHMENT0)
-        pixels = gl.glReadPixels(0, 0, *self.texture.max_size, gl.GL_RGB, gl.GL_UNSIGNED_BYTE)
-        return np.frombuffer(pixels, dtype=np.uint8)
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, self.pixel_buffers[index])
+        gl.glReadPixels(0, 0, *self.size, gl.GL_RGB, gl.GL_UNSIGNED_BYTE, gl.GLvoidp(0))
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)  # unbind
+        self.fences[index] = gl.glFenceSync(gl.GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+
+    def wait_readback(self, index: int) -> np.array:
+        """-> mapped_pixels[index], once the GPU has finished writing to it"""
+        fence = self.fences[index]
+        if fence is not None:
+            # NOTE: the first wait flushes, so the fence is guaranteed to signal
+            flags, timeout = gl.GL_SYNC_FLUSH_COMMANDS_BIT, 1_000_000  # 1ms
+            while gl.glClientWaitSync(fence, flags, timeout) == gl.GL_TIMEOUT_EXPIRED:
+                flags = 0
+            gl.glDeleteSync(fence)
+            self.fences[index] = None
+        return self.mapped_pixels[index]
+
+    def free_index(self) -> int:
+        """a pixel buffer that's neither pending nor last handed out by draw_pipelined()"""
+        in_use = (self.pending_index, self.returned_index)
+        return next(i for i in range(len(self.pixel_buffers)) if i not in in_use)
+
+    def readback(self) -> np.array:
+        """draw & wait for the pixels"""
+        # NOTE: skips the buffers draw_pipelined() is still using
+        index = self.free_index()
+        self.queue_readback(index)
+        return self.wait_readback(index)
+
+    def draw(self) -> np.array:
+        """draw & return a copy of the pixels"""
+        return self.readback().copy()
+
+    def draw_view(self) -> np.array:
+        """draw() w/o the copy; a read-only view of a mapped buffer, overwritten by later draws"""
+        return self.readback()
+
+    def draw_into(self, out: np.array):
+        """draw() into a preallocated, C-contiguous uint8 array"""
+        pixels = self.readback()
+        if out.nbytes != pixels.nbytes or not out.flags.c_contiguous:
+            raise ValueError("out must be a C-contiguous array of width * height * 3 bytes")
+        np.copyto(out.reshape(-1), pixels, casting="no")
+
+    def draw_async(self, sink: Callable[[np.array], Any]) -> concurrent.futures.Future:
+        """draw(), then sink(pixels) on a worker thread; -> Future of sink's result"""
+        # NOTE: lets the caller draw the next texture while sink encodes / saves
+        # -- readback() reuses its buffers, so sink gets its own copy
+        return worker_pool().submit(sink, self.readback().copy())
+
+    def draw_bytes(self) -> bytes:  # RGB_888
+        """draw() w/o wrapping the pixels in an array; e.g. for hashing / saving"""
+        return self.readback().tobytes()
+
+    def draw_pipelined(self) -> Union[None, np.array]:
+        """draw, but return the pixels of the previous draw_pipelined() call"""
+        # NOTE: returns None the first time; use read_pending() to get the last frame
+        # -- this frame's readback is only queued, so the CPU rarely waits on the GPU
+        # -- since the previous frame's readback has had a whole frame to finish
+        # NOTE: pixels are valid until the next draw* / read_pending call
+        index = self.free_index()
+        self.queue_readback(index)
+        out = self.read_pending()
+        self.pending_index = index
+        return out
+
+    def read_pending(self) -> Union[None, np.array]:
+        """pixels queued by the last draw_pipelined(); None if already read"""
+        if self.pending_index is None:
+            return None
+        out = self.wait_readback(self.pending_index)
+        self.returned_index = self.pending_index
+        self.pending_index = None
+        return out
@@ -1,10 +1,13 @@
 from __future__ import annotations
+import ctypes
 import enum
+import itertools
+from typing import List
 
 import numpy as np
 import OpenGL.GL as gl
 
-from ..textures.base import Face, MipIndex, Size, Texture
+from ..textures.base import MipIndex, Size, Texture, mip_pyramid
 from ..textures import dds
 from ..textures import vtf
 from . import base
@@ -20,14 +23,20 @@ class BPTC(enum.Enum):
     UNSIGNED_FLOAT = 0x8E8F  # COMPRESSED_RGB_BPTC_UNSIGNED_FLOAT_ARB
 
 
+internal_formats = {
+    (dds.Dds, dds.DXGI.BC6H_UF16): (BPTC.UNSIGNED_FLOAT.value, True),
+    (vtf.Vtf, vtf.Format.BC6H_UF16): (BPTC.UNSIGNED_FLOAT.value, True)}
+# ^ {(TextureClass, texture.format): (gl_format, is_compressed)}
+
+
 def internal_format(texture: Texture) -> (int, bool):
-    format_for = {
-        "dds": {
-            dds.DXGI.BC6H_UF16: (BPTC.UNSIGNED_FLOAT.value, True)},
-        "vtf": {
-            vtf.Format.BC6H_UF16: (BPTC.UNSIGNED_FLOAT.value, True)}}
-    # ^ {"ext": {texture.format: (gl_format, is_compressed)}}
-    return format_for[texture.extension][texture.format]
+    # NOTE: keyed by class too, since IntEnum formats of different classes can share values
+    # -- walks the MRO so subclasses of Dds / Vtf are covered
+    for cls in type(texture).__mro__:
+        key = (cls, texture.format)
+        if key in internal_formats:
+            return internal_formats[key]
+    raise KeyError(texture.format)
 
 
 class FrameBuffer2D(base.Renderer):
@@ -36,22 +45,46 @@ class FrameBuffer2D(base.Renderer):
 
     # TODO: update texture mips
 
-    def init_texture_2d(self, size: Size, fmt: int, is_compressed: bool, data: bytes):
-        self.texture0 = gl.glGenTextures(1)
-        gl.glBindTexture(gl.GL_TEXTURE_2D, self.texture0)
-        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_LINEAR)
-        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_LINEAR)
-        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_S, gl.GL_CLAMP_TO_EDGE)
-        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_T, gl.GL_CLAMP_TO_EDGE)
+    def init_texture_2d(self, size: Size, fmt: int, is_compressed: bool, mips: List[bytes]):
+        # mips: [b"raw_mipmap"], largest first
+        self.texture0 = base.create_name(gl.glCreateTextures, gl.GL_TEXTURE_2D)
+        # NOTE: immutable storage; allocated once for every level
+        if not is_compressed:
+            mips = mips[:1]
+        gl.glTextureStorage2D(self.texture0, len(mips), fmt, *size)
+        # NOTE: mips are copied into a staging buffer, which the driver uploads from
+        # -- so PyOpenGL never copies them & the upload doesn't block
+        *offsets, total = itertools.accumulate(map(len, mips), initial=0)
+        staging_buffer = base.create_name(gl.glCreateBuffers)
+        gl.glNamedBufferStorage(staging_buffer, total, None, gl.GL_MAP_WRITE_BIT)
+        address = gl.glMapNamedBufferRange(staging_buffer, 0, total, gl.GL_MAP_WRITE_BIT)
+        staging = np.frombuffer((ctypes.c_uint8 * total).from_address(address), dtype=np.uint8)
+        for mip, offset in zip(mips, offsets):
+            staging[offset:offset + len(mip)] = np.frombuffer(mip, dtype=np.uint8)
+        del staging  # must not outlive the mapping
+        gl.glUnmapNamedBuffer(staging_buffer)
+        gl.glBindBuffer(gl.GL_PIXEL_UNPACK_BUFFER, staging_buffer)
         if is_compressed:
-            gl.glCompressedTexImage2D(gl.GL_TEXTURE_2D, 0, fmt, *size, 0, data)
+            # NOTE: the driver consumes the compressed blocks as-is
+            mip_sizes = mip_pyramid(tuple(size), len(mips))
+            for level, (mip, mip_size, offset) in enumerate(zip(mips, mip_sizes, offsets)):
+                gl.glCompressedTextureSubImage2D(
+                    self.texture0, level, 0, 0, *mip_size, fmt, len(mip), gl.GLvoidp(offset))
         else:
             # NOTE: using GL_RGB because RGBA is hard
             # -- difficult, but not impossible
             fmt2 = gl.GL_RGB
             type_ = gl.GL_UNSIGNED_BYTE
-            gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, fmt, *size, 0, fmt2, type_, data)
-        # NOTE: don't unbind texture
+            gl.glTextureSubImage2D(self.texture0, 0, 0, 0, *size, fmt2, type_, gl.GLvoidp(0))
+        gl.glBindBuffer(gl.GL_PIXEL_UNPACK_BUFFER, 0)  # unbind
+        # NOTE: the driver keeps the staging buffer alive until the upload is done
+        gl.glDeleteBuffers(1, [staging_buffer])
+
+    def bind(self):
+        super().bind()
+        # NOTE: filtering & wrapping come from a shared sampler, not the texture
+        gl.glBindSampler(0, base.sampler(gl.GL_LINEAR, gl.GL_CLAMP_TO_EDGE))
+        gl.glBindTextureUnit(0, self.texture0)
 
     @classmethod
     def from_texture(cls, texture: Texture) -> FrameBuffer2D:
@@ -77,6 +110,9 @@ class FrameBuffer2D(base.Renderer):
         # add data
         size = texture.max_size
         format_, is_compressed = internal_format(texture)
-        data = texture.mipmaps[MipIndex(0, 0, Face(0))]
-        out.init_texture_2d(size, format_, is_compressed, data)
+        face = texture.default_mip().face
+        mips = [
+            texture.mipmaps[MipIndex(mip, 0, face)]
+            for mip in range(texture.num_mipmaps)]
+        out.init_texture_2d(size, format_, is_compressed, mips)
         return out
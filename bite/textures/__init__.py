@@ -1,7 +1,7 @@
 __all__ = [
     "base",
     "dds", "pvr", "vms", "vtf",
-    "Face", "MipIndex", "Size", "Texture",
+    "Face", "MipIndex", "MipTable", "Size", "Texture",
     "Dds", "Pvr", "Vms", "Vtf"]
 
 
@@ -11,7 +11,7 @@ from . import pvr
 from . import vms
 from . import vtf
 
-from .base import Face, MipIndex, Size, Texture
+from .base import Face, MipIndex, MipTable, Size, Texture
 from .dds import Dds
 from .pvr import Pvr
 from .vms import Vms
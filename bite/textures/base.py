@@ -1,6 +1,11 @@
 from __future__ import annotations
+from collections.abc import MutableMapping
 import enum
-from typing import Dict, Tuple, Union
+import functools
+import io
+import itertools
+import mmap
+from typing import Dict, Iterator, List, NamedTuple, Tuple, Union
 
 import breki
 
@@ -9,6 +14,41 @@ Size = Tuple[int, int]
 # ^ (width, height)
 
 
+mmap_threshold = 16 * 1024 ** 2  # bytes
+
+
+def read_view(stream: io.BufferedIOBase, length: int = -1) -> memoryview:
+    """stream.read(length), but without copying if possible"""
+    start = stream.tell()
+    if length < 0:  # rest of stream
+        length = stream.seek(0, io.SEEK_END) - start
+        stream.seek(start)
+    # NOTE: .from_bytes() streams share their buffer with the raw bytes
+    # -- so slicing a view of .getvalue() skips an intermediate copy
+    if isinstance(stream, io.BytesIO):
+        view = memoryview(stream.getvalue())[start:start + length]
+    # NOTE: large files are memory-mapped & paged in by the OS on demand
+    # -- the mapping is closed once the last view of it is released
+    # -- on Windows the file can't be overwritten until then
+    elif isinstance(stream, io.BufferedReader) and length >= mmap_threshold:
+        mapping = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapping)[start:start + length]
+    else:
+        return memoryview(stream.read(length))
+    stream.seek(len(view), 1)
+    return view
+
+
+# NOTE: cached since batches of textures tend to share dimensions
+@functools.lru_cache(maxsize=64)
+def mip_pyramid(max_size: Size, num_mipmaps: int) -> Tuple[Size]:
+    """dimensions of each mipmap, largest first"""
+    width, height = max_size
+    return tuple(
+        (max(width >> mip, 1), max(height >> mip, 1))
+        for mip in range(num_mipmaps))
+
+
 class Face(enum.Enum):
     """Cubemap Face Index; follows DirectX order"""
     # see: Microsoft Learn - Cubic Environment Mapping (Direct3D 9)
@@ -20,15 +60,30 @@ class Face(enum.Enum):
     BACK = 5  # Z-
 
 
-class MipIndex:
-    mip: int  # 0 = largest
-    frame: int
-    face: Union[None, Face]
+# NOTE: indexing a tuple is much cheaper than Face(int) or iterating Face
+all_faces = tuple(Face)
+
+
+class EnumTable(dict):
+    """{member.value: member}; unknown values fall back to enum_(value)"""
+    # NOTE: so an invalid value raises ValueError, not a bare KeyError
+    # -- __missing__ only runs on a miss, so valid lookups stay plain dict lookups
+    enum: enum.EnumMeta
 
-    def __init__(self, mip, frame=0, face=None):
-        self.mip = mip
-        self.frame = frame
-        self.face = face
+    def __init__(self, enum_: enum.EnumMeta):
+        super().__init__({member.value: member for member in enum_})
+        self.enum = enum_
+
+    def __missing__(self, value):
+        return self.enum(value)
+
+
+class MipIndex(NamedTuple):
+    mip: int  # 0 = largest
+    frame: int = 0
+    face: Union[None, Face] = None
+    # NOTE: used as a dict key for every mipmap
+    # -- a tuple, so __hash__, __eq__ & __iter__ are the C implementations
 
     def __repr__(self) -> str:
         args = [
@@ -38,16 +93,155 @@ class MipIndex:
             args.append(f"face=Face.{self.face.name}")
         return f"{self.__class__.__name__}({', '.join(args)})"
 
-    def __eq__(self, other) -> bool:
-        if isinstance(other, MipIndex):
-            return hash(self) == hash(other)
-        return False
 
-    def __hash__(self):
-        return hash((self.mip, self.frame, self.face))
+# NOTE: cached so iterating a MipTable doesn't build a MipIndex per mipmap
+@functools.lru_cache(maxsize=64)
+def mip_indices(num_frames: int, num_mipmaps: int, is_cubemap: bool) -> Tuple[MipIndex]:
+    """every MipIndex, ordered by frame, face, mip"""
+    faces = all_faces if is_cubemap else (None,)
+    return tuple(
+        MipIndex(mip, frame, face)
+        for frame in range(num_frames)
+        for face in faces
+        for mip in range(num_mipmaps))
+
+
+# NOTE: cached like mip_pyramid; MipTable copies the result, since it's edited
+@functools.lru_cache(maxsize=64)
+def mip_offsets(mip_sizes: Tuple[int], num_slots: int) -> Tuple[int]:
+    """start of each mipmap in a blob of num_slots * mip_sizes"""
+    # NOTE: num_slots = num_frames * num_faces
+    return tuple(itertools.accumulate(mip_sizes * num_slots, initial=0))[:-1]
+
+
+class MipTable(MutableMapping):
+    """contiguous mipmap storage w/ a dict-like {MipIndex: bytes} interface"""
+    # NOTE: mipmaps are returned as zero-copy memoryviews of .blob
+    _blob: Union[bytes, memoryview]
+    # ^ every mipmap back to back; ordered by frame, face, mip
+    edits: Dict[int, bytes]  # {slot: mipmap} set since .blob was last rebuilt
+    offsets: List[int]  # start of each mipmap in blob; stale for edited slots
+    sizes: List[Union[None, int]]  # length of each mipmap; None if empty
+    num_faces: int  # 6 if is_cubemap else 1
+    num_frames: int
+    num_mipmaps: int
+    is_cubemap: bool
+
+    def __init__(self, blob: bytes, mip_sizes: List[int], num_frames: int, is_cubemap: bool):
+        self._blob = blob
+        self.edits = dict()
+        self.is_cubemap = is_cubemap
+        self.num_faces = 6 if is_cubemap else 1
+        self.num_frames = num_frames
+        self.num_mipmaps = len(mip_sizes)
+        num_slots = num_frames * self.num_faces
+        self.sizes = [*mip_sizes] * num_slots
+        self.offsets = [*mip_offsets(tuple(mip_sizes), num_slots)]
+
+    @classmethod
+    def from_stream(cls, stream: io.BufferedIOBase, mip_sizes: List[int], num_frames: int, is_cubemap: bool) -> MipTable:
+        """read every mipmap from stream"""
+        # NOTE: one read for all mipmaps; they're sliced out of .blob on access
+        num_slots = num_frames * (6 if is_cubemap else 1)
+        blob = read_view(stream, sum(mip_sizes) * num_slots)
+        return cls(blob, mip_sizes, num_frames, is_cubemap)
+
+    def __repr__(self) -> str:
+        descriptor = f"{len(self)} mipmaps"
+        return f"<{self.__class__.__name__} {descriptor} @ 0x{id(self):016X}>"
+
+    def _slot(self, index: MipIndex) -> int:
+        """-> index into .offsets & .sizes"""
+        # NOTE: also accepts plain tuples, like a dict keyed w/ MipIndex would
+        try:
+            mip, frame, face = MipIndex(*index)
+        except TypeError:
+            raise KeyError(index)
+        if self.is_cubemap and isinstance(face, Face):
+            face = face.value
+        elif not self.is_cubemap and face is None:
+            face = 0
+        else:
+            raise KeyError(index)
+        if not (0 <= frame < self.num_frames and 0 <= mip < self.num_mipmaps):
+            raise KeyError(index)
+        return (frame * self.num_faces + face) * self.num_mipmaps + mip
+
+    @property
+    def blob(self) -> Union[bytes, memoryview]:
+        """every mipmap back to back; ordered by frame, face, mip"""
+        self._compact()
+        return self._blob
+
+    def _compact(self):
+        """rebuild .blob & .offsets w/ any edits"""
+        # NOTE: edits are only joined in when needed, so filling a table is O(n), not O(n^2)
+        if len(self.edits) == 0:
+            return
+        blob = memoryview(self._blob)
+        mipmaps, offsets, offset = list(), list(), 0
+        for slot, (start, size) in enumerate(zip(self.offsets, self.sizes)):
+            mipmap = self.edits.get(slot, blob[start:start + (size or 0)])
+            mipmaps.append(mipmap)
+            offsets.append(offset)
+            offset += len(mipmap)
+        self._blob = b"".join(mipmaps)
+        self.offsets = offsets
+        self.edits = dict()
+
+    def __getitem__(self, index: MipIndex) -> memoryview:
+        slot = self._slot(index)
+        size = self.sizes[slot]
+        if size is None:
+            raise KeyError(index)
+        if slot in self.edits:
+            return memoryview(self.edits[slot])
+        start = self.offsets[slot]
+        return memoryview(self._blob)[start:start + size]
+
+    def __setitem__(self, index: MipIndex, mipmap: bytes):
+        slot = self._slot(index)
+        self.edits[slot] = mipmap
+        self.sizes[slot] = len(mipmap)
+
+    def __delitem__(self, index: MipIndex):
+        slot = self._slot(index)
+        if self.sizes[slot] is None:
+            raise KeyError(index)
+        self.edits[slot] = b""
+        self.sizes[slot] = None
 
-    def __iter__(self):
-        return iter((self.mip, self.frame, self.face))
+    def __iter__(self) -> Iterator[MipIndex]:
+        indices = mip_indices(self.num_frames, self.num_mipmaps, self.is_cubemap)
+        return (
+            index
+            for index, size in zip(indices, self.sizes)
+            if size is not None)
+
+    def __len__(self) -> int:
+        return sum(size is not None for size in self.sizes)
+
+    def values(self) -> Iterator[memoryview]:
+        """skips MipIndex lookups; ordered by frame, face, mip"""
+        blob = memoryview(self.blob)  # NOTE: applies any edits
+        return (
+            blob[start:start + size]
+            for start, size in zip(self.offsets, self.sizes)
+            if size is not None)
+
+    def frame(self, frame: int) -> MipTable:
+        """a single frame as a new table"""
+        if not 0 <= frame < self.num_frames:
+            raise IndexError(frame)
+        self._compact()
+        stride = self.num_faces * self.num_mipmaps
+        first, last = frame * stride, (frame + 1) * stride
+        start = self.offsets[first] if stride > 0 else 0
+        out = MipTable(b"", [0] * self.num_mipmaps, 1, self.is_cubemap)
+        out.sizes = self.sizes[first:last]
+        out.offsets = [offset - start for offset in self.offsets[first:last]]
+        out._blob = self._blob[start:start + sum(size or 0 for size in out.sizes)]
+        return out
 
 
 class Texture(breki.ParsedFile):
@@ -59,9 +253,9 @@ class Texture(breki.ParsedFile):
     num_mipmaps: int
     num_frames: int
     # data
-    mipmaps: Dict[MipIndex, bytes]
+    mipmaps: Union[Dict[MipIndex, bytes], MipTable]
     # ^ {MipIndex(mip, frame, face): b"raw_mipmap"}
-    raw_data: Union[None, bytes]  # for when mips cannot be split
+    raw_data: Union[None, bytes, memoryview]  # for when mips cannot be split
     # NOTE: texture should have (num_mipmaps, num_frames, is_cubemap)
     # -- this defines the full range of possible mipmaps keys
     # properties
@@ -83,7 +277,7 @@ class Texture(breki.ParsedFile):
 
     # utilities
     def default_mip(self) -> MipIndex:
-        face = Face(0) if self.is_cubemap else None
+        face = Face.RIGHT if self.is_cubemap else None
         return MipIndex(0, 0, face)
 
     def mip_size(self, index: MipIndex) -> Size:
@@ -91,9 +285,12 @@ class Texture(breki.ParsedFile):
         # -- if texture is block compressed, crop to this size
         # -- after rounding up to the nearest block size
         width, height = self.max_size
-        width >>= index.mip
-        height >>= index.mip
-        return (width, height)
+        mip = index.mip
+        return (max(width >> mip, 1), max(height >> mip, 1))
+
+    def mip_sizes(self) -> Tuple[Size]:
+        """.mip_size() for every mip; largest first"""
+        return mip_pyramid(tuple(self.max_size), self.num_mipmaps)
 
     # properties
     @property
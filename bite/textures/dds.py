@@ -3,9 +3,11 @@
 # https://learn.microsoft.com/en-us/windows/win32/direct3ddds/dds-header
 from __future__ import annotations
 import enum
+import functools
 import math
 import os
-from typing import Dict, List, Union
+import struct
+from typing import Dict, List, Tuple, Union
 
 import breki
 from breki.files.parsed import parse_first
@@ -14,7 +16,8 @@ from . import base
 
 
 # formats
-class DXGI(enum.Enum):
+# NOTE: IntEnum hashes & compares as int, speeding up the lookup tables below
+class DXGI(enum.IntEnum):
     UNKNOWN = 0x00
     RGBA_32323232_TYPELESS = 0x01
     RGBA_32323232_FLOAT = 0x02
@@ -150,6 +153,11 @@ dxgi_from_magic = {
     b"BC5U": DXGI.BC5_UNORM,
     b"DXT1": DXGI.BC1_UNORM}
 
+# NOTE: plain dict lookups skip Enum.__call__
+# -- breki keeps values that are already members as-is
+dxgi_from_value = base.EnumTable(DXGI)
+magic_from_dxgi = {dxgi: magic for magic, dxgi in dxgi_from_magic.items()}
+
 
 bytes_per_pixel = {
     **{F: 4 for F in (
@@ -216,6 +224,20 @@ min_block_size = {
         DXGI.BC7_TYPELESS, DXGI.BC7_UNORM, DXGI.BC7_UNORM_SRGB)}}
 
 
+@functools.lru_cache(maxsize=64)
+def mip_data_sizes(size: base.Size, num_mipmaps: int, format_: DXGI) -> Tuple[int]:
+    """bytes per mipmap, largest first; KeyError if bpp is unknown"""
+    bpp = bytes_per_pixel[format_]
+    if format_ in min_block_size and format_ != DXGI.R_1_UNORM:
+        block_size = min_block_size[format_]  # bytes per 4x4 block
+        return tuple(
+            math.ceil(width / 4) * math.ceil(height / 4) * block_size
+            for width, height in base.mip_pyramid(size, num_mipmaps))
+    return tuple(
+        max(math.ceil(width * height * bpp), min_block_size.get(format_, 0))
+        for width, height in base.mip_pyramid(size, num_mipmaps))
+
+
 # flag enums
 class AlphaFlag(enum.IntFlag):
     UNKNOWN = 0x00
@@ -232,6 +254,9 @@ class Dimension(enum.Enum):
     TEXTURE_3D = 0x04  # width x height x depth
 
 
+dimension_from_value = base.EnumTable(Dimension)
+
+
 class Flags(enum.IntFlag):
     CAPS = 0x00000001
     HEIGHT = 0x00000002
@@ -264,6 +289,12 @@ class DdsHeader(breki.Struct):
     _format = "4s7I44s2I"
     _arrays = {"size": ["width", "height"], "pixel_format": 2}
     _classes = {"flags": Flags}
+    _struct = struct.Struct(_format)  # precompiled
+    # NOTE: magic, header_size, reserved & pixel_format never change
+    # -- so they can be validated with one compare against the raw bytes
+    _constants = (
+        b"DDS " + struct.pack("I", 0x7C),  # [:8]
+        b"\0" * 44 + struct.pack("2I", 0x20, 0x04))  # [32:84]
 
 
 class DX10Header(breki.Struct):
@@ -284,6 +315,18 @@ class DX10Header(breki.Struct):
     _classes = {
         "format": DXGI, "dimension": Dimension,
         "misc_flag": MiscFlag, "alpha_flag": AlphaFlag}
+    _struct = struct.Struct(_format)  # precompiled
+    # NOTE: reserved_1 & reserved_2 are always empty
+    # -- [88:108] & [112:128] of the full header
+    _constants = (b"\0" * 20, b"\0" * 16)
+
+
+# NOTE: DX10Header opens w/ the tail of the original header
+# -- (fourcc, bitmasks & caps), so legacy files stop before .format
+# -- either way the whole header is read & unpacked at once
+legacy_header = struct.Struct(DdsHeader._format + "4s20sI16s")  # 128 bytes
+full_header = struct.Struct(DdsHeader._format + DX10Header._format)  # 148 bytes
+# NOTE: DdsHeader unpacks to 11 values; DX10Header gets the rest
 
 
 class Dds(base.Texture, breki.BinaryFile):
@@ -292,7 +335,7 @@ class Dds(base.Texture, breki.BinaryFile):
     header_2: DX10Header
     format: DXGI
     # pixel data
-    mipmaps: Dict[base.MipIndex, bytes]
+    mipmaps: Union[Dict[base.MipIndex, bytes], base.MipTable]
     # ^ {MipIndex(mip, frame, face): raw_mipmap_data}
     raw_data: Union[bytes, None]  # if mipmaps cannot be split
     # properties
@@ -316,31 +359,31 @@ class Dds(base.Texture, breki.BinaryFile):
         """separate a cubemap array into multiple files"""
         assert self.header is not None
         assert self.header_2 is not None
+        if self.raw_data is not None:
+            raise RuntimeError(f"can't split {self.filename}; mipmaps weren't parsed (unknown bpp)")
         out = list()
-        base_filename = os.path.splitext(self.filename)[0]
+        base_filepath = os.path.join(
+            self.folder, os.path.splitext(self.filename)[0])
         is_cubemap = self.is_cubemap
+        header_2 = self.header_2.as_tuple()
         for i in range(self.num_frames):
-            child = Dds()
+            child = Dds(f"{base_filepath}.{i}.dds")
             child.is_parsed = True
-            child.filename = f"{base_filename}.{i}.dds"
             child.header = self.header
-            child.header_2 = self.header_2
+            # NOTE: each child gets it's own header_2 to edit
+            child.header_2 = DX10Header.from_tuple(header_2)
+            child.header_2.array_size = 6 if is_cubemap else 1
+            child.format = self.format
             child.max_size = self.max_size
+            child.num_mipmaps = self.num_mipmaps
             child.num_frames = 1
-            if is_cubemap:
-                child.header_2.array_size = 6
-                indices = {
-                    (mip, face): base.MipIndex(mip, i, base.Face(face))
-                    for mip in range(self.num_mipmaps)
-                    for face in range(6)}
-            else:
-                child.header_2.array_size = 1
-                indices = {
-                    (mip, None): base.MipIndex(mip, i, None)
-                    for mip in range(self.num_mipmaps)}
-            child.mipmaps = {
-                base.MipIndex(mip, 0, face): self.mipmaps[index]
-                for (mip, face), index in indices.items()}
+            if isinstance(self.mipmaps, base.MipTable):
+                child.mipmaps = self.mipmaps.frame(i)
+            else:  # mipmaps assigned as a dict
+                child.mipmaps = {
+                    index._replace(frame=0): mipmap
+                    for index, mipmap in self.mipmaps.items()
+                    if index.frame == i}
             out.append(child)
         return out
 
@@ -357,27 +400,35 @@ class Dds(base.Texture, breki.BinaryFile):
         if self.is_parsed:
             return
         self.is_parsed = True
-        # header
-        self.header = DdsHeader.from_stream(self.stream)
-        assert self.header.magic == b"DDS "
-        assert self.header.header_size == 0x7C
+        # headers
+        raw_header = self.stream.read(legacy_header.size)
+        assert (raw_header[:8], raw_header[32:84]) == DdsHeader._constants
+        magic = raw_header[84:88]
+        if magic == b"DX10":  # DX10 extended header
+            assert (raw_header[88:108], raw_header[112:128]) == DX10Header._constants
+            raw_header += self.stream.read(full_header.size - legacy_header.size)
+            header = full_header.unpack(raw_header)
+        else:
+            header = legacy_header.unpack(raw_header)
+        self.header = DdsHeader.from_tuple(header[:11])
         # assert self.header.pitch_or_linear_size == 0x00010000
         # assert self.header.depth == 0x01
-        assert self.header.reserved == b"\0" * 44
-        assert self.header.pixel_format == (0x20, 0x04)
-        magic = self.stream.read(4)
-        if magic == b"DX10":  # DX10 extended header
-            self.stream.seek(-4, 1)
-            self.header_2 = DX10Header.from_stream(self.stream)
-            assert self.header_2.reserved_1 == b"\0" * 20
+        header_2 = header[11:]
+        if magic == b"DX10":
+            self.header_2 = DX10Header.from_tuple((
+                *header_2[:4],
+                dxgi_from_value[header_2[4]],
+                dimension_from_value[header_2[5]],
+                *header_2[6:]))
             # assert self.header_2.unknown == 0x00401008
-            assert self.header_2.reserved_2 == b"\0" * 16
-        else:  # magic -> dummy header_2
-            self.header_2 = DX10Header(
-                array_size=1,
-                dimension=Dimension.TEXTURE_2D,
-                format=dxgi_from_magic[magic],
-                misc_flag=MiscFlag(0))
+        else:  # fill out the rest of header_2 w/ dummy values
+            self.header_2 = DX10Header.from_tuple((
+                *header_2,
+                dxgi_from_magic[magic],
+                Dimension.TEXTURE_2D,
+                MiscFlag(0),
+                1,  # array_size
+                AlphaFlag.UNKNOWN))
         # expose the essentials
         self.format = self.header_2.format
         self.max_size = tuple(self.header.size)
@@ -387,29 +438,16 @@ class Dds(base.Texture, breki.BinaryFile):
             assert self.num_frames % 6 == 0
             self.num_frames = self.num_frames // 6
         # calculate mip_sizes
-        width, height = self.max_size
         try:
-            bpp = bytes_per_pixel[self.format]
+            mip_sizes = mip_data_sizes(
+                self.max_size, self.num_mipmaps, self.format)
         except KeyError:
             # TODO: UserWarning(f"Unknown bpp for format: {self.format.name}")
             self.raw_data = self.stream.read()
             return
-        mbs = min_block_size.get(self.format, 0)
-        mip_sizes = [
-            max(math.ceil((width >> i) * (height >> i) * bpp), mbs)
-            for i in range(self.num_mipmaps)]
         # read mipmaps
-        if self.is_cubemap:
-            self.mipmaps = {
-                base.MipIndex(mip, frame, face): self.stream.read(mip_size)
-                for frame in range(self.num_frames)
-                for face in base.Face
-                for mip, mip_size in enumerate(mip_sizes)}
-        else:
-            self.mipmaps = {
-                base.MipIndex(mip, frame, None): self.stream.read(mip_size)
-                for frame in range(self.num_frames)
-                for mip, mip_size in enumerate(mip_sizes)}
+        self.mipmaps = base.MipTable.from_stream(
+            self.stream, mip_sizes, self.num_frames, self.is_cubemap)
 
     @parse_first
     def as_bytes(self) -> bytes:
@@ -417,27 +455,21 @@ class Dds(base.Texture, breki.BinaryFile):
         assert self.header_2 is not None
         # NOTE: assumes headers are accurate to data
         # headers
-        out = [self.header.as_bytes()]
+        header = self.header.as_tuple()
+        header_2 = self.header_2.as_tuple()
         if self.header_2.magic == b"DX10":
-            out.append(self.header_2.as_bytes())
-        else:  # header_2 is fake
-            dxgi_magic = {
-                dxgi: magic
-                for magic, dxgi in dxgi_from_magic.items()}
-            out.append(dxgi_magic[self.format])
+            header = full_header.pack(*header, *header_2)
+        else:  # only the start of header_2 is real
+            header = legacy_header.pack(
+                *header, magic_from_dxgi[self.format], *header_2[1:4])
+        out = [header]
         # mip data
         if isinstance(self.raw_data, bytes):
             out.append(self.raw_data)
-        else:
-            if self.is_cubemap:
-                out.extend([
-                    self.mipmaps[base.MipIndex(mip, frame, face)]
-                    for frame in range(self.num_frames)
-                    for face in base.Face
-                    for mip in reversed(range(self.num_mipmaps))])
-            else:
-                out.extend([
-                    self.mipmaps[base.MipIndex(mip, frame)]
-                    for frame in range(self.array_size)
-                    for mip in reversed(range(self.num_mipmaps))])
+        elif isinstance(self.mipmaps, base.MipTable):  # NOTE: .blob is already in file order
+            out.append(self.mipmaps.blob)
+        else:  # mipmaps assigned as a dict
+            out.extend(
+                self.mipmaps[index]
+                for index in base.mip_indices(self.num_frames, self.num_mipmaps, self.is_cubemap))
         return b"".join(out)
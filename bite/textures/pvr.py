@@ -3,16 +3,19 @@
 # for PowerVR GPUs (Apple | OpenGL ES)
 from __future__ import annotations
 import enum
-import io
+import functools
 import math
-from typing import Union
+import struct
+from typing import Iterable, Tuple, TYPE_CHECKING, Union
 
 import breki
-from breki.binary import read_struct, write_struct
 from breki.files.parsed import parse_first
 
 from . import base
 
+if TYPE_CHECKING:  # NOTE: numpy is only imported by scan_headers()
+    import numpy as np
+
 
 class PixelMode(enum.Enum):
     ARGB_1555 = 0x00
@@ -36,6 +39,15 @@ bytes_per_pixel = {
 # NOTE: no compressed PixelMode, no min_block_size
 
 
+@functools.lru_cache(maxsize=64)
+def mip_data_sizes(size: base.Size, num_mipmaps: int, pixel_mode: PixelMode) -> Tuple[int]:
+    """bytes per mipmap, largest first"""
+    bpp = bytes_per_pixel[pixel_mode]
+    return tuple(
+        math.ceil(width * height * bpp)
+        for width, height in base.mip_pyramid(size, num_mipmaps))
+
+
 class TextureMode(enum.Enum):
     TWIDDLED = 0x01
     TWIDDLED_MIPS = 0x02
@@ -55,6 +67,14 @@ class TextureMode(enum.Enum):
     ALT_TWIDDLED_MIPS = 0x12
 
 
+# NOTE: dict lookups skip Enum.__call__ when parsing
+pixel_mode_from_value = base.EnumTable(PixelMode)
+texture_mode_from_value = base.EnumTable(TextureMode)
+mips_modes = frozenset(
+    mode for mode in TextureMode
+    if mode.name.endswith("_MIPS"))
+
+
 class Format:
     pixel: PixelMode
     texture: TextureMode
@@ -79,6 +99,34 @@ class Format:
         return "_".join([self.pixel.name, self.texture.name])
 
 
+# magic, data_size, pixel_mode, texture_mode, padding, width, height
+pvrt_header = struct.Struct("4sI2BH2H")  # precompiled
+# magic, length
+gbix_header = struct.Struct("4sI")
+
+
+def scan_headers(raw_files: Iterable[bytes]) -> np.ndarray:
+    """PVRT header of each raw .pvr file as one numpy structured array"""
+    # NOTE: for cataloguing many files; fields are read in bulk, not per file
+    # NOTE: like Pvr.parse(), files may start w/ a GBIX header; it's skipped
+    import numpy as np
+    header_dtype = np.dtype([
+        ("magic", "S4"),
+        ("data_size", "<u4"),
+        ("pixel_mode", "u1"),
+        ("texture_mode", "u1"),
+        ("padding", "<u2"),
+        ("width", "<u2"),
+        ("height", "<u2")])
+    raw_headers = list()
+    for raw in raw_files:
+        start = 0
+        if raw[:4] == b"GBIX":
+            start = gbix_header.size + int.from_bytes(raw[4:8], "little")
+        raw_headers.append(raw[start:start + pvrt_header.size])
+    return np.frombuffer(b"".join(raw_headers), dtype=header_dtype)
+
+
 class Pvr(base.Texture, breki.BinaryFile):
     exts = ["*.pvr"]
     # essentials
@@ -93,7 +141,7 @@ class Pvr(base.Texture, breki.BinaryFile):
         # defaults
         self.gbix = None
         self.data_size = 8
-        self.format = Format(PixelMode(0), TextureMode(1))
+        self.format = Format(PixelMode.ARGB_1555, TextureMode.TWIDDLED)
         self.num_frames = 1
         self.num_mipmaps = 1
 
@@ -108,71 +156,57 @@ class Pvr(base.Texture, breki.BinaryFile):
             return
         self.is_parsed = True
         # header
-        magic = self.stream.read(4)
-        if magic == b"GBIX":
-            length = read_struct(self.stream, "I")
+        # NOTE: GBIX & PVRT headers both start w/ 8 bytes of magic & length
+        raw_header = self.stream.read(gbix_header.size)
+        if raw_header[:4] == b"GBIX":
+            length = int.from_bytes(raw_header[4:], "little")
             self.gbix = self.stream.read(length)  # 1 or 2 ints?
-            magic = self.stream.read(4)
+            raw_header = self.stream.read(gbix_header.size)
+        raw_header += self.stream.read(pvrt_header.size - len(raw_header))
+        magic, self.data_size, pixel_mode, texture_mode, padding, *max_size = (
+            pvrt_header.unpack(raw_header))
         assert magic == b"PVRT"
-        self.data_size = read_struct(self.stream, "I")
-        pixel_mode, texture_mode = read_struct(self.stream, "2B")
-        self.format = Format(PixelMode(pixel_mode), TextureMode(texture_mode))
-        assert read_struct(self.stream, "H") == 0  # padding
-        self.max_size = read_struct(self.stream, "2H")
+        assert padding == 0
+        self.format = Format(
+            pixel_mode_from_value[pixel_mode],
+            texture_mode_from_value[texture_mode])
+        self.max_size = tuple(max_size)
         # mipmap indexing
-        # if out.format.texture.name.endswith("_MIPS"):
+        # if self.format.texture in mips_modes:
         #     raise NotImplementedError("PVR w/ mipmaps")
         #     out.num_mipmaps = ...
         if self.format.pixel not in bytes_per_pixel:
             # TODO: UserWarning / log
-            self.raw_data = self.stream.read()
+            self.raw_data = base.read_view(self.stream)
             return
         # calculate mip_sizes
-        width, height = self.max_size
-        bpp = bytes_per_pixel[self.format.pixel]
-        mip_sizes = [
-            math.ceil((width >> i) * (height >> i) * bpp)
-            for i in range(self.num_mipmaps)]
+        mip_sizes = mip_data_sizes(
+            self.max_size, self.num_mipmaps, self.format.pixel)
         # NOTE: should catch VQ & _MIPS TextureModes
         if sum(mip_sizes) + 8 != self.data_size:
             # TODO: UserWarning / log
-            self.raw_data = self.stream.read()
+            self.raw_data = base.read_view(self.stream)
             return  # invalid mip_sizes
         # read mipmaps
-        self.mipmaps = {
-            base.MipIndex(mip, 0, None): self.stream.read(mip_size)
-            for mip, mip_size in enumerate(mip_sizes)}
+        self.mipmaps = base.MipTable.from_stream(self.stream, mip_sizes, 1, False)
 
     @parse_first
     def as_bytes(self) -> bytes:
-        stream = io.BytesIO()
-        if isinstance(self.raw_data, bytes):
-            data_size = len(self.raw_data)
+        out = list()
+        # NOTE: MipTable.values() is already in file order
+        if self.raw_data is not None:
+            mip_data = [self.raw_data]
         else:
-            # NOTE: will be incorrect for some TextureModes
-            data_size = sum(
-                len(mipmap)
-                for mipmap in self.mipmaps.values())
-        data_size += 8
+            mip_data = list(self.mipmaps.values())
+        # NOTE: will be incorrect for some TextureModes
+        data_size = sum(map(len, mip_data)) + 8
         # gbix
         if isinstance(self.gbix, bytes):
-            stream.write(b"GBIX")
-            write_struct(stream, "I", len(self.gbix))
-            stream.write(self.gbix)
+            out.extend([gbix_header.pack(b"GBIX", len(self.gbix)), self.gbix])
         # header
-        stream.write(b"PVRT")
-        write_struct(stream, "I", data_size)
-        write_struct(stream, "B", self.format.pixel.value)
-        write_struct(stream, "B", self.format.texture.value)
-        write_struct(stream, "H", 0)  # padding
-        write_struct(stream, "2H", *self.max_size)
-        # mip data
-        if isinstance(self.raw_data, bytes):
-            stream.write(self.raw_data)
-        else:
-            stream.write(b"".join([
-                self.mipmaps[base.MipIndex(mip, 0, None)]
-                for mip in range(self.num_mipmaps)]))
-        # stream -> bytes
-        stream.seek(0)
-        return stream.read()
+        out.append(pvrt_header.pack(
+            b"PVRT", data_size,
+            self.format.pixel.value, self.format.texture.value,
+            0, *self.max_size))  # 0 is padding
+        out.extend(mip_data)
+        return b"".join(out)
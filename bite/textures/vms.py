@@ -2,9 +2,6 @@
 from __future__ import annotations
 from typing import Any, Dict
 
-from PIL import Image
-from PIL import ImageOps
-
 import breki
 from breki.binary import read_struct
 from breki.files.parsed import parse_first
@@ -55,30 +52,28 @@ class Vms(base.Texture, breki.BinaryFile):
             self.mipmaps["colour"] = (palette, indices)
 
     def save_monochrome(self, filename: str):
+        # NOTE: PIL is only needed for saving; keeps `import bite.textures` fast
+        from PIL import Image, ImageOps
         monochrome = self.mipmaps["monochrome"]
         img = ImageOps.invert(Image.frombytes("1", (32, 32), monochrome))
         img.save(filename)
 
     def save_colour(self, filename: str):
+        import numpy as np
+        from PIL import Image
         if "colour" not in self.mipmaps:
             raise RuntimeError("no colour icon")
         int_palette, indices = self.mipmaps["colour"]
         assert len(int_palette) == 16
         assert len(indices) == 512
-        palette = list()
-        pixels = list()
-        for c in int_palette:
-            a = c >> 0xC & 0xF
-            r = c >> 0x8 & 0xF
-            g = c >> 0x4 & 0xF
-            b = c >> 0x0 & 0xF
-            a = a | a << 4
-            r = r | r << 4
-            g = g | g << 4
-            b = b | b << 4
-            rgba = bytes([r, g, b, a])
-            palette.append(rgba)
-        for index in indices:
-            pixels.append(palette[index >> 4])
-            pixels.append(palette[index & 15])
-        Image.frombytes("RGBA", (32, 32), b"".join(pixels)).save(filename)
+        # ARGB_4444 palette -> RGBA_8888
+        argb = np.array(int_palette, dtype=np.uint16)[:, np.newaxis]
+        palette = ((argb >> [0x8, 0x4, 0x0, 0xC]) & 0xF).astype(np.uint8)
+        palette |= palette << 4
+        # 4-bit indices; high nibble first
+        raw_indices = np.frombuffer(indices, dtype=np.uint8)
+        pixels = np.empty((raw_indices.size, 2), dtype=np.uint8)
+        pixels[:, 0] = raw_indices >> 4
+        pixels[:, 1] = raw_indices & 0xF
+        rgba = palette[pixels.ravel()]
+        Image.frombytes("RGBA", (32, 32), rgba.tobytes()).save(filename)
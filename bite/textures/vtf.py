@@ -2,19 +2,21 @@
 # https://github.com/NeilJed/VTFLib/blob/main/VTFLib/VTFFormat.h
 from __future__ import annotations
 import enum
+import functools
 import io
 import math
 import struct
 from typing import Any, Dict, List, Tuple, Union
 
 import breki
-from breki.binary import read_struct, write_struct
+from breki.binary import read_struct
 from breki.files.parsed import parse_first
 
 from . import base
 
 
-class Format(enum.Enum):
+# NOTE: IntEnum hashes & compares as int, speeding up the lookup tables below
+class Format(enum.IntEnum):
     NONE = -1
     RGBA_8888 = 0
     ABGR_8888 = 1
@@ -47,6 +49,9 @@ class Format(enum.Enum):
     BC6H_UF16 = 66  # r2 / r5 cubemaps.hdr.vtf only
 
 
+# NOTE: plain dict lookup skips Enum.__call__
+format_from_value = base.EnumTable(Format)
+
 bytes_per_pixel = {
     Format.RGBA_8888: 32,
     Format.ABGR_8888: 32,
@@ -79,12 +84,12 @@ bytes_per_pixel = {
     Format.BC6H_UF16: 1}
 
 
-dxt_formats = (
+dxt_formats = {
     Format.DXT1,
     Format.DXT3,
     Format.DXT5,
     Format.DXT1_ONE_BIT_ALPHA,
-    Format.BC6H_UF16)
+    Format.BC6H_UF16}
 
 
 def mip_data_size(size, level, format_) -> int:
@@ -101,6 +106,18 @@ def mip_data_size(size, level, format_) -> int:
     return math.ceil(width * height * bpp)
 
 
+# NOTE: cached so .parse() & .as_bytes() don't build a MipIndex per mipmap
+@functools.lru_cache(maxsize=64)
+def mip_order(num_mipmaps: int, num_frames: int, is_cubemap: bool) -> Tuple[base.MipIndex]:
+    """every MipIndex in file order; smallest mip first"""
+    faces = base.all_faces if is_cubemap else (None,)
+    return tuple(
+        base.MipIndex(mip, frame, face)
+        for mip in reversed(range(num_mipmaps))
+        for frame in range(num_frames)
+        for face in faces)
+
+
 class Flags(enum.IntFlag):
     POINT_SAMPLE = 0x00000001
     TRILINEAR = 0x00000002
@@ -260,7 +277,7 @@ class Vtf(base.Texture, breki.BinaryFile):
         self.num_frames = self.header.num_frames
         # funky alignment
         self.num_mipmaps = read_struct(self.stream, "B")
-        self.thumbnail_format = Format(read_struct(self.stream, "i"))
+        self.thumbnail_format = format_from_value[read_struct(self.stream, "i")]
         self.thumbnail_size = read_struct(self.stream, "2B")
         if minor == 1:  # v7.1
             assert self.stream.read(1) == b"\0"  # padding
@@ -311,17 +328,15 @@ class Vtf(base.Texture, breki.BinaryFile):
             mip_data_size(self.max_size, i, self.format)
             for i in range(self.num_mipmaps)]
         # read mipmaps
-        if self.is_cubemap:
-            self.mipmaps.update({
-                base.MipIndex(mip, frame, face): self.stream.read(mip_size)
-                for mip, mip_size in reversed([*enumerate(mip_sizes)])
-                for frame in range(self.num_frames)
-                for face in base.Face})
-        else:
-            self.mipmaps.update({
-                base.MipIndex(mip, frame, None): self.stream.read(mip_size)
-                for mip, mip_size in reversed([*enumerate(mip_sizes)])
-                for frame in range(self.num_frames)})
+        # NOTE: one read for all mipmaps; each is a zero-copy slice of it
+        order = mip_order(self.num_mipmaps, self.num_frames, self.is_cubemap)
+        blob = base.read_view(
+            self.stream, sum(mip_sizes[index.mip] for index in order))
+        offset = 0
+        for index in order:
+            size = mip_sizes[index.mip]
+            self.mipmaps[index] = blob[offset:offset + size]
+            offset += size
 
     @property
     @parse_first
@@ -349,20 +364,20 @@ class Vtf(base.Texture, breki.BinaryFile):
 
     @parse_first
     def as_bytes(self) -> bytes:
-        stream = io.BytesIO()
         # header
         header_size = 80 + len(self.resources) * 8
         self.header.header_size = header_size
-        stream.write(self.header.as_bytes())
-        write_struct(stream, "B", self.num_mipmaps)
-        write_struct(stream, "i", self.thumbnail_format.value)
-        write_struct(stream, "2B", *self.thumbnail_size)
-        # v7.2+
-        write_struct(stream, "H", self.mipmap_depth)
-        # v7.3+
-        stream.write(b"\0" * 3)
-        write_struct(stream, "I", len(self.resources))
-        stream.write(b"\0" * 8)
+        out = [
+            self.header.as_bytes(),
+            struct.pack(
+                "<Bi2BH",
+                self.num_mipmaps,
+                self.thumbnail_format.value,
+                *self.thumbnail_size,
+                self.mipmap_depth),  # v7.2+
+            b"\0" * 3,  # v7.3+
+            struct.pack("I", len(self.resources)),
+            b"\0" * 8]
         # resources
         # TODO: verify / calculate resource offsets
         offset = header_size  # vtf_header + 8 bytes per resource
@@ -383,27 +398,24 @@ class Vtf(base.Texture, breki.BinaryFile):
         # NOTE: Image Data is always last!
         if "Image Data" in self.resources:
             self.resources["Image Data"].offset = offset
-        stream.write(b"".join(r.as_bytes() for r in self.resources.values()))
-        assert stream.tell() == header_size
+        out.extend(r.as_bytes() for r in self.resources.values())
+        assert sum(map(len, out)) == header_size
         # cma
         if self.cma is not None:
-            stream.write(self.cma.as_bytes())
+            out.append(self.cma.as_bytes())
         # mip data
         assert "Image Data" in self.resources
-        assert self.resources["Image Data"].offset == stream.tell()
+        assert self.resources["Image Data"].offset == sum(map(len, out))
         # TODO: check .is_cubemap & use alternate packing
         assert Flags.ENVMAP in self.header.flags
         if isinstance(self.raw_data, bytes):
-            stream.write(self.raw_data)
-        else:
-            stream.write(b"".join([
-                self.mipmaps[base.MipIndex(mip, frame, face)]
-                for mip in range(self.num_mipmaps)
-                for frame in range(self.num_frames)
-                for face in range(6)]))
-        # stream -> bytes
-        stream.seek(0)
-        return stream.read()
+            out.append(self.raw_data)
+        else:  # same order as .parse()
+            out.extend(
+                self.mipmaps[index]
+                for index in mip_order(
+                    self.num_mipmaps, self.num_frames, self.is_cubemap))
+        return b"".join(out)
 
 
 class CMA:
@@ -5,21 +5,18 @@ from typing import Any, Dict, List
 import dearpygui.dearpygui as imgui
 import numpy as np
 
-from .textures.base import Face, MipIndex, Size, Texture
+from .textures.base import all_faces, MipIndex, Size, Texture
 # texture formats
 from .textures import dds
 from .textures import pvr
 from .textures import vtf
 # mipmap translation
 from . import decode
+from .pixels import RGB24_to_RGBA32_into
 from . import render
 
 
-def rgb_to_rgba(rgb: bytes) -> bytes:
-    rgb_array = np.frombuffer(rgb, dtype=np.uint8)
-    rgb_pixels = rgb_array.reshape(rgb_array.size // 3, 3)
-    rgba = np.insert(rgb_pixels, 3, 0xFF, axis=1).flatten()
-    return rgba.tobytes()
+magenta = np.array([1, 0, 1, 1], dtype=np.float32)  # placeholder pixel
 
 
 class Viewer:
@@ -53,11 +50,8 @@ class Viewer:
         self.texture_tags = list()
         # register mip textures
         with imgui.texture_registry(show=False):
-            for mip in range(self.texture.num_mipmaps):
-                width, height = self.mip_size(mip)
-                texture_floats = (np.frombuffer(
-                    b"\xFF\x00\xFF\xFF" * width * height,
-                    dtype=np.uint8) / 255).astype(np.float32)
+            for width, height in self.texture.mip_sizes():
+                texture_floats = np.tile(magenta, width * height)
                 self.texture_tags.append(imgui.add_raw_texture(
                     width=width, height=height,
                     default_value=texture_floats,
@@ -108,9 +102,9 @@ class Viewer:
         else:
             cls = self.texture.__class__.__name__
             raise NotImplementedError(f"Cannot get pixels from '{cls}'")
-        return (np.frombuffer(
-            texture_bytes,
-            dtype=np.uint8) / 255).astype(np.float32)
+        # NOTE: float32 throughout; no float64 intermediate
+        out = np.frombuffer(texture_bytes, dtype=np.uint8).astype(np.float32)
+        return np.divide(out, 255, out=out)
 
     def pixels_dds(self) -> bytes:  # RGBA_8888
         texture_bytes = self.texture.mipmaps[self.index]
@@ -122,7 +116,10 @@ class Viewer:
             # texture_bytes *= 4
             frame_buffer = render.FrameBuffer2D.from_texture(self.texture)
             # TODO: update frame_buffer MipIndex & viewport size
-            texture_bytes = rgb_to_rgba(frame_buffer.draw())
+            rgb = frame_buffer.draw_view()  # consumed before the next draw
+            # NOTE: expanded straight from the readback buffer; no intermediate bytes
+            texture_bytes = np.empty((rgb.size // 3, 4), dtype=np.uint8)
+            RGB24_to_RGBA32_into(rgb, texture_bytes)
         else:
             fmt = self.texture.format.name
             raise NotImplementedError(f"Cannot convert: '{fmt}'")
@@ -154,9 +151,12 @@ class Viewer:
         # RGB -> RGBA
         mode = out.shape[2]
         if mode == 3:  # DXT1 -> RGB_888
-            out = rgb_to_rgba(out.flatten().tobytes())
+            # NOTE: np.frombuffer reads the array directly; no .tobytes() copy
+            rgba = np.empty((out.shape[0] * out.shape[1], 4), dtype=np.uint8)
+            RGB24_to_RGBA32_into(np.ascontiguousarray(out), rgba)
+            out = rgba.tobytes()
         elif mode == 4:  # DXTn -> RGBA_8888
-            out = out.flatten().tobytes()
+            out = out.tobytes()
         else:
             raise RuntimeError(f"invalid DXT decode: {mode=}")
         return out
@@ -184,7 +184,7 @@ class Viewer:
         mip, frame, face = self.index
         if self.texture.is_cubemap:
             face_index = imgui.get_value(self.face_tag)
-            face = Face(face_index)
+            face = all_faces[face_index]
         else:  # force to None, just in case
             face = None
         self.index = MipIndex(mip, frame, face)
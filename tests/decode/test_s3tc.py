@@ -0,0 +1,97 @@
+import struct
+
+import numpy as np
+
+from bite.decode import s3tc
+
+
+white, black = [255] * 3, [0] * 3
+
+
+def dxt1_blocks(*blocks) -> np.array:
+    """(c0, c1, row0) -> array of s3tc.dxt1_block"""
+    raw_blocks = b"".join(
+        struct.pack("<2H4B", c0, c1, row0, 0, 0, 0)
+        for c0, c1, row0 in blocks)
+    return np.frombuffer(raw_blocks, dtype=s3tc.dxt1_block)
+
+
+def test_DXT1_tiles():
+    # row 0 = indices 0, 1, 2, 3
+    blocks = dxt1_blocks((0xFFFF, 0x0000, 0b11100100), (0x0000, 0xFFFF, 0b11100100))
+    tiles = s3tc.DXT1_tiles(blocks)
+    assert tiles.shape == (2, 4, 4, 3)
+    # NOTE: tiles are indexed [block][x][y]
+    assert tiles[0, :, 0].tolist() == [white, black, [170] * 3, [85] * 3]
+    assert tiles[0, 0, 1].tolist() == white
+    assert tiles[1, :, 0].tolist() == [black, white, [85] * 3, [170] * 3]
+    # c0 <= c1 -> 3 colours + black
+    tiles = s3tc.DXT1_tiles(blocks, fast=False)
+    assert tiles[0, :, 0].tolist() == [white, black, [170] * 3, [85] * 3]
+    assert tiles[1, :, 0].tolist() == [black, white, [127] * 3, black]
+
+
+def test_DXT5_alpha_tiles():
+    # pixel (0, 0) -> index 0, pixel (1, 0) -> index 1, pixel (0, 1) -> index 7
+    indices = (1 << 3 | 7 << 12).to_bytes(6, "little")
+    blocks = np.frombuffer(bytes([255, 0]) + indices, dtype=np.uint8).reshape(-1, 8)
+    tiles = s3tc.DXT5_alpha_tiles(blocks)
+    assert tiles.shape == (1, 4, 4, 1)
+    assert tiles[0, :2, 0, 0].tolist() == [255, 0]
+    assert tiles[0, 0, 1, 0] == (255 * 1 + 0 * 6) // 7
+    # a0 <= a1 -> 4 interpolated alphas + 0 & 255
+    blocks = np.frombuffer(bytes([0, 100]) + indices, dtype=np.uint8).reshape(-1, 8)
+    tiles = s3tc.DXT5_alpha_tiles(blocks)
+    assert tiles[0, :2, 0, 0].tolist() == [0, 100]
+    assert tiles[0, 0, 1, 0] == 255
+
+
+def test_DXT3_alpha_tiles():
+    # pixel (0, 0) -> 0x1, pixel (1, 0) -> 0x2, pixel (0, 1) -> 0xF
+    blocks = np.frombuffer(bytes([0x21, 0, 0x0F, 0, 0, 0, 0, 0]), dtype=np.uint8)
+    tiles = s3tc.DXT3_alpha_tiles(blocks.reshape(-1, 8))
+    assert tiles.shape == (1, 4, 4, 1)
+    assert tiles[0, :3, 0, 0].tolist() == [0x11, 0x22, 0x00]
+    assert tiles[0, 0, 1, 0] == 0xFF
+
+
+def test_rgb565_as_rgb888():
+    assert s3tc.rgb565_as_rgb888(0xF800) == (255, 0, 0)
+    pixels = np.array([0x0000, 0x07E0, 0x001F, 0x8410], dtype=np.int32)
+    r, g, b = s3tc.rgb565_as_rgb888(pixels)
+    assert r.tolist() == [0, 0, 0, 132]
+    assert g.tolist() == [0, 255, 0, 130]
+    assert b.tolist() == [0, 0, 255, 132]
+
+
+def test_bc6h_layouts():
+    # every endpoint bit is stored exactly once & indices fill the rest
+    for mode, (is_transformed, endpoint_bits, delta_bits, layout) in s3tc.bc6h_modes.items():
+        num_regions = 1 if mode & 0b11 == 0b11 else 2
+        bits = [
+            (field, bit)
+            for field, lowest_bit, num_bits, is_reversed in s3tc.bc6h_layouts[mode]
+            for bit in range(lowest_bit, lowest_bit + num_bits)]
+        assert len(bits) == len(set(bits))
+        num_mode_bits = 2 if mode < 0b10 else 5
+        assert num_mode_bits + len(bits) == {1: 65, 2: 82}[num_regions]
+        for i, channel in enumerate("rgb"):
+            for endpoint in "wxyz"[:num_regions * 2]:
+                num_bits = endpoint_bits if endpoint == "w" else delta_bits[i]
+                field_bits = {bit for field, bit in bits if field == f"{channel}{endpoint}"}
+                assert field_bits == set(range(num_bits))
+
+
+def test_BC6H_tiles():
+    # mode 11 (1 region, 10-bit endpoints): w = 0, x = max
+    block = 0b00011 | 1023 << 35 | 1023 << 45 | 1023 << 55
+    block |= 0b1111 << (65 + 3 + 4 * 4)  # pixel (1, 1) -> index 15 (x)
+    blocks = np.frombuffer(block.to_bytes(16, "little"), dtype=np.uint8)
+    tiles = s3tc.BC6H_tiles(blocks.reshape(-1, 16))
+    assert tiles.shape == (1, 4, 4, 3)
+    assert tiles.dtype == np.float16
+    assert tiles[0, 0, 0].tolist() == [0.0] * 3
+    assert tiles[0, 1, 1].tolist() == [65504.0] * 3  # max float16
+    # reserved modes decode to black
+    blocks = np.frombuffer(b"\x13" + b"\xFF" * 15, dtype=np.uint8)
+    assert not s3tc.BC6H_tiles(blocks.reshape(-1, 16)).any()
@@ -0,0 +1,16 @@
+from bite.decode import twiddle
+
+
+def test_detwiddle_lut():
+    lut = twiddle.detwiddle_lut(4, 4)
+    assert lut.reshape(4, 4).tolist() == [
+        [0, 1, 4, 5],
+        [2, 3, 6, 7],
+        [8, 9, 12, 13],
+        [10, 11, 14, 15]]
+    # rectangles are a row of twiddled squares
+    lut = twiddle.detwiddle_lut(4, 2)
+    assert lut.reshape(2, 4).tolist() == [
+        [0, 1, 4, 5],
+        [2, 3, 6, 7]]
+    assert sorted(twiddle.detwiddle_lut(2, 8)) == list(range(16))
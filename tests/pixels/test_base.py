@@ -1,4 +1,8 @@
+import copy
+import pickle
+
 import numpy as np
+import pytest
 
 from bite.pixels import base
 
@@ -20,3 +24,84 @@ def test_Format():
         [2, 1, 0],
         [5, 4, 3]], dtype=np.uint8)
     assert np.array_equal(bgr_array, expected_bgr)
+
+
+def test_Array_as_bytes():
+    # uniform channels are written as-is
+    rgb_888 = base.Format(red=8, green=8, blue=8)
+    rgb = base.Array.from_array(rgb_888, np.array([[0, 1, 2], [3, 4, 5]], dtype=np.uint8))
+    assert rgb.as_bytes() == b"\x00\x01\x02\x03\x04\x05"
+    # packed pixels; first channel in the highest bits
+    rgb_565 = base.Format(red=5, green=6, blue=5)
+    rgb = base.Array.from_array(rgb_565, np.array([[0x3E, 0x3F, 0x02]], dtype=np.uint8))
+    assert rgb.as_bytes() == (0xF800 | 0x07E0 | 0x0001).to_bytes(2, "little")
+
+
+def test_Format_packed():
+    # 16bpp formats unpack via a lookup table; channels expand to max bits
+    rgb_565 = base.Format(red=5, green=6, blue=5)
+    raw_pixels = np.array([0xF800, 0x07E0, 0x0841], dtype=np.uint16).tobytes()
+    rgb_array = rgb_565.array_from(raw_pixels)
+    expected_rgb = np.array([
+        [63, 0, 0],
+        [0, 63, 0],
+        [2, 2, 2]], dtype=np.uint8)
+    assert np.array_equal(rgb_array, expected_rgb)
+    assert base.Array.from_bytes(rgb_565, raw_pixels).as_bytes() == raw_pixels
+
+
+def test_Array_shuffle():
+    rgb_888 = base.Format(red=8, green=8, blue=8)
+    bgr_888 = base.Format(blue=8, green=8, red=8)
+    rgb = base.Array.from_bytes(rgb_888, b"\x00\x01\x02\x03\x04\x05")
+    assert np.array_equal(rgb.channels["green"], [1, 4])
+    bgr = rgb.shuffle(bgr_888)
+    assert bgr.channels["red"] is rgb.channels["red"]
+    assert bgr.as_bytes() == b"\x02\x01\x00\x05\x04\x03"
+
+
+def test_Array_init():
+    rgb_888 = base.Format(red=8, green=8, blue=8)
+    pixels = np.array([[0, 1, 2], [3, 4, 5]], dtype=np.uint8)
+    rgb = base.Array(rgb_888, pixels)
+    assert len(rgb) == 2
+    assert np.array_equal(rgb.array, pixels)
+    rgb.array = pixels[::-1]
+    assert np.array_equal(rgb.channels["red"], [3, 0])
+    with pytest.raises(TypeError):
+        base.Array(rgb_888, {"red": pixels[:, 0]})
+
+
+def test_Format_from_name():
+    rgb_565 = base.Format.from_name("RGB_565")
+    assert rgb_565.name == "RGB_565"
+    assert [channel.bits for channel in rgb_565.channels] == [5, 6, 5]
+    assert base.Format.from_name("RGB_565") is rgb_565  # cached
+    assert base.Format.from_name("RGBA_16161616").bits_per_pixel == 64
+
+
+def test_Channel_interned():
+    red = base.Channel("red", 8)
+    assert base.Channel("red", 8) is red
+    assert copy.copy(red) is red
+    assert copy.deepcopy(red) is red
+    assert pickle.loads(pickle.dumps(red)) is red
+    alpha = base.Channel("alpha", 1, "X")
+    assert pickle.loads(pickle.dumps(alpha)) is alpha
+    # shared by every Format, so must not be editable
+    with pytest.raises(AttributeError):
+        red.bits = 4
+    assert red.bits == 8
+
+
+def test_Format_from_name_shared():
+    fmt = base.Format.from_name("RGB_565")
+    assert base.Format.from_name("RGB_565") is fmt
+    # shared by every caller, so must not be editable
+    with pytest.raises(AttributeError):
+        fmt.channels = base.Format(red=8).channels
+    assert fmt.name == "RGB_565"
+    assert fmt.bits_per_pixel == 16
+    # still copyable & picklable
+    assert pickle.loads(pickle.dumps(fmt)).name == "RGB_565"
+    assert copy.deepcopy(fmt).channels == fmt.channels
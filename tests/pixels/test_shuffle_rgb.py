@@ -0,0 +1,31 @@
+import numpy as np
+
+from bite.pixels import shuffle_rgb
+
+
+def test_RGB24_to_RGB565():
+    rgb24 = bytes([0xFF, 0x00, 0x00, 0x00, 0xFF, 0x00, 0x08, 0x04, 0xFF])
+    rgb565 = shuffle_rgb.RGB24_to_RGB565(rgb24)
+    assert rgb565 == b"".join(
+        pixel.to_bytes(2, "little")
+        for pixel in (0xF800, 0x07E0, 0x083F))
+    assert shuffle_rgb.RGB565_to_RGB24(rgb565)[:6] == rgb24[:6]
+
+
+def test_RGB24_to_RGBA32():
+    rgba32 = shuffle_rgb.RGB24_to_RGBA32(b"\x00\x01\x02\x03\x04\x05")
+    assert rgba32 == b"\x00\x01\x02\xFF\x03\x04\x05\xFF"
+
+
+def test_ARGB16_to_RGBA32():
+    # alpha in the lowest nibble; each nibble doubles up to a full byte
+    argb16 = (0x1234).to_bytes(2, "little")
+    assert shuffle_rgb.ARGB16_to_RGBA32(argb16) == b"\x33\x22\x11\x44"
+
+
+def test_into():
+    # write multiple conversions into one preallocated buffer
+    out = np.zeros((3, 4), dtype=np.uint8)
+    shuffle_rgb.RGB24_to_RGBA32_into(b"\x00\x01\x02\x03\x04\x05", out[:2])
+    shuffle_rgb.ARGB16_to_RGBA32_into((0x1234).to_bytes(2, "little"), out[2:])
+    assert out.tobytes() == b"\x00\x01\x02\xFF\x03\x04\x05\xFF\x33\x22\x11\x44"
@@ -0,0 +1,113 @@
+import contextlib
+import importlib
+import sys
+import types
+
+import numpy as np
+import pytest
+
+import bite
+
+
+def fake_gl() -> types.ModuleType:
+    """stands in for OpenGL.GL; constants are unique ints, functions do nothing"""
+    gl = types.ModuleType("OpenGL.GL")
+    constants = dict()
+
+    def getattr_(name):
+        if name.startswith("GL_"):
+            return constants.setdefault(name, len(constants) + 1)
+        return lambda *args: None
+
+    gl.__getattr__ = getattr_
+    gl.glClientWaitSync = lambda *args: gl.GL_ALREADY_SIGNALED
+    return gl
+
+
+def is_faked(name: str) -> bool:
+    """modules importing bite.render.base replaces or imports against the fakes"""
+    return any(
+        name == package or name.startswith(f"{package}.")
+        for package in ("OpenGL", "bite.render"))
+
+
+@contextlib.contextmanager
+def fake_opengl():
+    """import bite.render.base against a fake OpenGL, then put the real modules back"""
+    error = types.ModuleType("OpenGL.error")
+    error.GLError = type("GLError", (Exception,), dict())
+    opengl = types.ModuleType("OpenGL")
+    opengl.GL, opengl.error = fake_gl(), error
+    # NOTE: importing bite.render.base also imports bite.render & its other submodules
+    # -- so every one of them is swapped out & restored afterwards, w/ bite.render itself
+    real_modules = {name: module for name, module in sys.modules.items() if is_faked(name)}
+    real_render = bite.__dict__.get("render")
+    for name in real_modules:
+        del sys.modules[name]
+    sys.modules.update({"OpenGL": opengl, "OpenGL.GL": opengl.GL, "OpenGL.error": error})
+    try:
+        yield importlib.import_module("bite.render.base")
+    finally:
+        for name in [name for name in sys.modules if is_faked(name)]:
+            del sys.modules[name]
+        sys.modules.update(real_modules)
+        if real_render is None:
+            bite.__dict__.pop("render", None)
+        else:
+            bite.render = real_render
+
+
+@pytest.fixture
+def render_base():
+    with fake_opengl() as module:
+        yield module
+
+
+def test_fake_opengl_cleanup():
+    before = {name: module for name, module in sys.modules.items() if is_faked(name)}
+    render_before = bite.__dict__.get("render")
+    with fake_opengl() as module:
+        assert sys.modules["bite.render"].base is module
+    after = {name: module for name, module in sys.modules.items() if is_faked(name)}
+    assert after == before
+    assert bite.__dict__.get("render") is render_before
+
+
+def fake_renderer(render_base):
+    """Renderer w/o a context; each draw fills a 1x1 pixel buffer w/ the frame number"""
+    renderer = render_base.Renderer.__new__(render_base.Renderer)
+    renderer.pixel_buffers = [1, 2, 3]
+    renderer.mapped_pixels = [np.zeros(3, dtype=np.uint8) for i in range(3)]
+    renderer.fences = [None] * 3
+    renderer.pending_index = None
+    renderer.returned_index = None
+    frames = iter(range(1, 256))
+
+    def queue_readback(index):
+        renderer.mapped_pixels[index][:] = next(frames)
+        renderer.fences[index] = "fence"
+
+    renderer.queue_readback = queue_readback
+    return renderer
+
+
+def test_draw_into(render_base):
+    renderer = fake_renderer(render_base)
+    out = np.zeros((1, 1, 3), dtype=np.uint8)
+    renderer.draw_into(out)
+    assert out.tolist() == [[[1, 1, 1]]]
+    with pytest.raises(ValueError):
+        renderer.draw_into(np.zeros(4, dtype=np.uint8))
+
+
+def test_draw_pipelined_order(render_base):
+    renderer = fake_renderer(render_base)
+    assert renderer.draw_pipelined() is None  # frame 1 queued
+    previous = renderer.draw_pipelined()  # frame 2 queued
+    assert previous[0] == 1
+    assert renderer.readback()[0] == 3
+    assert previous[0] == 1  # not overwritten by an in-between draw
+    assert renderer.draw_pipelined()[0] == 2  # frame 4 queued
+    assert renderer.read_pending()[0] == 4
+    assert renderer.read_pending() is None
+
@@ -1,6 +1,6 @@
 import os
 
-from bite.materials.vmt import Vmt
+from bite.materials.vmt import Node, tokenize, Vmt
 
 
 # TODO: pytest parametrise
@@ -14,3 +14,19 @@ def test_vmt():
     assert vmt.textures["colour"] == "dev/test_pattern"
     assert vmt.textures["multiply"] == "models/tv/scanline"
     # TODO: assert vmt._raw caught texture proxies
+
+
+def test_tokenize():
+    assert tokenize('"UnlitTwoTexture"') == ("UnlitTwoTexture", None)
+    assert tokenize("$surfaceprop 'glass'") == ("$surfaceprop", "glass")
+    assert tokenize('"textureScrollRate" 25') == ("textureScrollRate", "25")
+    assert tokenize("$color [1 0 0]") == ("$color", "[1 0 0]")
+    assert tokenize('"unclosed') is None
+
+
+def test_node_str():
+    vmt = Vmt.from_file("tests/files/tv.vmt")
+    vmt.parse()
+    text = str(vmt._raw)
+    assert text.split("\n")[-4:] == ["      textureScrollAngle 0", "    }", "  }", "}"]
+    assert str(Node.from_iter(iter(text.split("\n")))) == text
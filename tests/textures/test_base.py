@@ -0,0 +1,44 @@
+import pytest
+
+from bite.textures import base
+
+
+def test_MipIndex():
+    index = base.MipIndex(1, 0, base.Face.RIGHT)
+    # a tuple, so interchangeable w/ one as a dict key
+    assert index == (1, 0, base.Face.RIGHT)
+    assert hash(index) == hash((1, 0, base.Face.RIGHT))
+    assert {(1, 0, base.Face.RIGHT): True}[index]
+    assert base.MipIndex(3) == base.MipIndex(3, 0, None)
+    # None & Face.RIGHT must not collide
+    assert base.MipIndex(0, 0, None) != base.MipIndex(0, 0, base.Face.RIGHT)
+    assert repr(base.MipIndex(3, 2)) == "MipIndex(mip=3, frame=2)"
+    assert repr(index) == "MipIndex(mip=1, frame=0, face=Face.RIGHT)"
+
+
+def test_MipTable_tuple_keys():
+    mipmaps = base.MipTable(b"\x00" * 20, [16, 4], 1, False)
+    assert (0, 0, None) in mipmaps
+    assert (1,) in mipmaps
+    assert mipmaps[(1, 0, None)] == b"\x00" * 4
+    assert (2, 0, None) not in mipmaps
+    assert "thumbnail" not in mipmaps
+
+
+def test_EnumTable():
+    faces = base.EnumTable(base.Face)
+    assert faces[5] is base.Face.BACK
+    with pytest.raises(ValueError):
+        faces[6]
+
+
+def test_MipTable_edits():
+    mipmaps = base.MipTable(b"\x00" * 16 + b"\x01" * 4, [16, 4], 1, False)
+    mipmaps[base.MipIndex(0)] = b"\x02" * 4  # resized
+    del mipmaps[base.MipIndex(1)]
+    assert mipmaps[base.MipIndex(0)] == b"\x02" * 4
+    assert base.MipIndex(1) not in mipmaps
+    assert mipmaps.blob == b"\x02" * 4
+    mipmaps[base.MipIndex(1)] = b"\x03"
+    assert list(mipmaps.values()) == [b"\x02" * 4, b"\x03"]
+    assert mipmaps.offsets == [0, 4]
@@ -0,0 +1,136 @@
+import struct
+
+import pytest
+
+from bite.textures import base
+from bite.textures.dds import DXGI, Dds, mip_data_sizes
+
+
+def dds_bytes(num_frames: int, is_cubemap: bool) -> bytes:
+    """16x16 BC6H_UF16 w/ 3 mipmaps"""
+    header = struct.pack(
+        "4s7I44s2I", b"DDS ", 0x7C, 0x000A1007, 16, 16,
+        0x00010000, 0x01, 3, b"\0" * 44, 0x20, 0x04)
+    array_size = num_frames * (6 if is_cubemap else 1)
+    header_2 = struct.pack(
+        "4s20sI16s5I", b"DX10", b"\0" * 20, 0x00401008, b"\0" * 16,
+        0x5F, 0x03, 0x04 if is_cubemap else 0x00, array_size, 0x00)
+    mip_sizes = (256, 64, 16)
+    mipmaps = [
+        bytes([i % 256]) * mip_size
+        for i in range(array_size)
+        for mip_size in mip_sizes]
+    return b"".join([header, header_2, *mipmaps])
+
+
+def test_cubemap_array():
+    raw_dds = dds_bytes(num_frames=2, is_cubemap=True)
+    dds = Dds.from_bytes("test.dds", raw_dds)
+    dds.parse()
+    assert dds.is_cubemap
+    assert dds.num_frames == 2
+    assert dds.num_mipmaps == 3
+    assert len(dds.mipmaps) == 2 * 6 * 3
+    index = base.MipIndex(1, 1, base.Face.UP)
+    assert dds.mipmaps[index] == bytes([6 + 2]) * 64
+    assert base.MipIndex(0, 0, None) not in dds.mipmaps
+    assert dds.as_bytes() == raw_dds
+
+
+def test_texture_array():
+    raw_dds = dds_bytes(num_frames=3, is_cubemap=False)
+    dds = Dds.from_bytes("test.dds", raw_dds)
+    dds.parse()
+    assert not dds.is_cubemap
+    assert len(dds.mipmaps) == 3 * 3
+    assert dds.mipmaps[base.MipIndex(2, 1)] == b"\x01" * 16
+    assert dds.as_bytes() == raw_dds
+
+
+def test_split():
+    raw_dds = dds_bytes(num_frames=2, is_cubemap=True)
+    dds = Dds.from_bytes("test.dds", raw_dds)
+    children = dds.split()
+    assert [child.filename for child in children] == ["test.0.dds", "test.1.dds"]
+    assert dds.header_2.array_size == 2 * 6
+    for i, child in enumerate(children):
+        assert child.is_cubemap
+        assert child.num_frames == 1
+        assert child.header_2.array_size == 6
+        index = base.MipIndex(0, 0, base.Face.BACK)
+        assert child.mipmaps[index] == dds.mipmaps[base.MipIndex(0, i, base.Face.BACK)]
+    assert b"".join(child.as_bytes()[148:] for child in children) == raw_dds[148:]
+
+
+def test_edit_mipmap():
+    raw_dds = dds_bytes(num_frames=1, is_cubemap=False)
+    dds = Dds.from_bytes("test.dds", raw_dds)
+    dds.parse()
+    index = base.MipIndex(1)
+    dds.mipmaps[index] = b"\xFF" * 8
+    assert dds.mipmaps[base.MipIndex(2)] == b"\x00" * 16
+    assert dds.as_bytes()[148:] == b"\x00" * 256 + b"\xFF" * 8 + b"\x00" * 16
+    del dds.mipmaps[index]
+    assert index not in dds.mipmaps
+    assert len(dds.mipmaps) == 2
+    assert list(dds.mipmaps) == [base.MipIndex(0), base.MipIndex(2)]
+
+
+def test_mip_data_sizes():
+    # non-square mips are padded to whole 4x4 blocks
+    assert mip_data_sizes((64, 4), 4, DXGI.BC6H_UF16) == (256, 128, 64, 32)
+    assert mip_data_sizes((8, 8), 4, DXGI.BC1_UNORM) == (32, 8, 8, 8)
+    assert mip_data_sizes((4, 2), 3, DXGI.R_16_FLOAT) == (16, 4, 2)
+
+
+def test_legacy_header():
+    """16x16 DXT1 w/ 3 mipmaps & no DX10 header"""
+    header = struct.pack(
+        "4s7I44s2I4s20sI16s", b"DDS ", 0x7C, 0x000A1007, 16, 16,
+        0x00010000, 0x01, 3, b"\0" * 44, 0x20, 0x04,
+        b"DXT1", b"\0" * 20, 0x00401008, b"\0" * 16)
+    mipmaps = [bytes([i]) * mip_size for i, mip_size in enumerate((128, 32, 8))]
+    raw_dds = b"".join([header, *mipmaps])
+    dds = Dds.from_bytes("test.dds", raw_dds)
+    dds.parse()
+    assert dds.format == DXGI.BC1_UNORM
+    assert dds.mipmaps[base.MipIndex(1, 0, None)] == mipmaps[1]
+    assert dds.as_bytes() == raw_dds
+
+
+def test_as_bytes_dict_mipmaps():
+    raw_dds = dds_bytes(num_frames=1, is_cubemap=True)
+    dds = Dds.from_bytes("test.dds", raw_dds)
+    dds.parse()
+    dds.mipmaps = {index: bytes(mipmap) for index, mipmap in dds.mipmaps.items()}
+    assert dds.as_bytes() == raw_dds
+
+
+def test_split_dict_mipmaps():
+    raw_dds = dds_bytes(num_frames=2, is_cubemap=True)
+    dds = Dds.from_bytes("test.dds", raw_dds)
+    dds.parse()
+    dds.mipmaps = {index: bytes(mipmap) for index, mipmap in dds.mipmaps.items()}
+    children = dds.split()
+    for i, child in enumerate(children):
+        assert len(child.mipmaps) == 6 * 3
+        index = base.MipIndex(2, 0, base.Face.UP)
+        assert child.mipmaps[index] == dds.mipmaps[base.MipIndex(2, i, base.Face.UP)]
+    assert b"".join(child.as_bytes()[148:] for child in children) == raw_dds[148:]
+    dds.raw_data = raw_dds[148:]
+    with pytest.raises(RuntimeError):
+        dds.split()
+
+
+def test_set_every_mipmap():
+    raw_dds = dds_bytes(num_frames=2, is_cubemap=True)
+    dds = Dds.from_bytes("test.dds", raw_dds)
+    dds.parse()
+    indices = list(dds.mipmaps)
+    assert len(indices) == 2 * 6 * 3
+    new_mipmaps = {index: bytes([255 - i]) * len(dds.mipmaps[index]) for i, index in enumerate(indices)}
+    for index, mipmap in new_mipmaps.items():
+        dds.mipmaps[index] = mipmap
+    assert {index: bytes(mipmap) for index, mipmap in dds.mipmaps.items()} == new_mipmaps
+    header_length = len(raw_dds) - sum(map(len, new_mipmaps.values()))
+    assert dds.as_bytes() == raw_dds[:header_length] + b"".join(new_mipmaps.values())
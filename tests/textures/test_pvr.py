@@ -0,0 +1,41 @@
+import struct
+
+from bite.textures import pvr
+
+
+def pvr_bytes(width: int, height: int, gbix: bytes = b"") -> bytes:
+    """ARGB_4444_TWIDDLED w/ an optional GBIX header"""
+    out = list()
+    if gbix != b"":
+        out.extend([struct.pack("4sI", b"GBIX", len(gbix)), gbix])
+    data = b"\xFF" * (width * height * 2)
+    out.append(struct.pack("4sI2BH2H", b"PVRT", len(data) + 8, 0x02, 0x01, 0, width, height))
+    out.append(data)
+    return b"".join(out)
+
+
+def test_scan_headers():
+    raw_files = [
+        pvr_bytes(8, 8),
+        pvr_bytes(16, 4, gbix=b"\x01" * 8)]
+    headers = pvr.scan_headers(raw_files)
+    assert list(headers["magic"]) == [b"PVRT", b"PVRT"]
+    assert list(headers["width"]) == [8, 16]
+    assert list(headers["height"]) == [8, 4]
+    assert list(headers["data_size"]) == [8 * 8 * 2 + 8, 16 * 4 * 2 + 8]
+    for raw, header in zip(raw_files, headers):
+        texture = pvr.Pvr.from_bytes("test.pvr", raw)
+        texture.parse()
+        assert texture.max_size == (header["width"], header["height"])
+        assert texture.format.pixel.value == header["pixel_mode"]
+
+
+def test_raw_data():
+    raw_pvr = pvr_bytes(8, 8)
+    raw_pvr = raw_pvr[:8] + b"\x07" + raw_pvr[9:]  # PixelMode.RESERVED
+    texture = pvr.Pvr.from_bytes("test.pvr", raw_pvr)
+    texture.parse()
+    assert texture.format.pixel == pvr.PixelMode.RESERVED
+    assert isinstance(texture.raw_data, memoryview)  # not copied
+    assert texture.raw_data == raw_pvr[16:]
+    assert texture.as_bytes() == raw_pvr